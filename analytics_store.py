@@ -0,0 +1,188 @@
+"""Analytics Store - columnar history of completed treatments"""
+import threading
+import time
+
+import numpy as np
+
+HOUR = 3600
+NUM_PRIORITIES = 4
+PERCENTILES = (50, 90, 95)
+# Longest window a query may cover, and how many window sizes keep a cached result
+MAX_WINDOW_HOURS = 90 * 24
+MAX_CACHED_WINDOWS = 32
+
+
+class TreatmentAnalytics:
+    """Append-only columns of completed treatments plus hourly roll-ups.
+
+    Each completion is appended to NumPy columns (ordered by completion
+    time) and added to per-hour counters: completions per priority and busy
+    seconds per doctor, with a treatment split across the hours it spans.
+    Window queries are aligned to whole hours. Throughput and utilization
+    are read from the hourly counters; wait percentiles are computed on the
+    column slice for the window and cached until new rows arrive or the
+    hour rolls over.
+    """
+    def __init__(self, doctor_ids, capacity=1024):
+        self.doctor_ids = list(doctor_ids)
+        self.doctor_index = {doctor_id: idx for idx, doctor_id in enumerate(self.doctor_ids)}
+        self.lock = threading.Lock()
+        self._capacity = capacity
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            capacity = self._capacity
+            self.size = 0
+            self.arrival = np.zeros(capacity)
+            self.start = np.zeros(capacity)
+            self.completion = np.zeros(capacity)
+            self.waiting = np.zeros(capacity)
+            self.priority = np.zeros(capacity, dtype=np.int8)
+            self.doctor = np.zeros(capacity, dtype=np.int16)
+            self.base_hour = None
+            self.hourly_completions = np.zeros((0, NUM_PRIORITIES), dtype=np.int64)
+            self.hourly_busy = np.zeros((0, len(self.doctor_ids)))
+            self.cache = {}
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        for name in ('arrival', 'start', 'completion', 'waiting', 'priority', 'doctor'):
+            column = getattr(self, name)
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _ensure_hour(self, hour):
+        """Grow the hourly tables to cover hour, prepending rows for hours before base_hour"""
+        if self.base_hour is None:
+            self.base_hour = hour
+        if hour < self.base_hour:
+            extra = max(self.base_hour - hour, 24)
+            self.hourly_completions = np.vstack((np.zeros((extra, NUM_PRIORITIES), dtype=np.int64), self.hourly_completions))
+            self.hourly_busy = np.vstack((np.zeros((extra, len(self.doctor_ids))), self.hourly_busy))
+            self.base_hour -= extra
+        rows = hour - self.base_hour + 1
+        if rows > len(self.hourly_completions):
+            extra = max(rows - len(self.hourly_completions), 24)
+            self.hourly_completions = np.vstack((self.hourly_completions, np.zeros((extra, NUM_PRIORITIES), dtype=np.int64)))
+            self.hourly_busy = np.vstack((self.hourly_busy, np.zeros((extra, len(self.doctor_ids)))))
+
+    def record(self, patient, doctor_id):
+        """Append a completed patient"""
+        if patient.completion_time is None or patient.start_time is None:
+            return False
+        start = patient.start_time.timestamp()
+        completion = patient.completion_time.timestamp()
+        priority = patient.priority if isinstance(patient.priority, int) and 0 <= patient.priority < NUM_PRIORITIES else NUM_PRIORITIES - 1
+        doctor = self.doctor_index.get(doctor_id, 0)
+        row = {
+            'arrival': patient.arrival_time.timestamp() if patient.arrival_time else start,
+            'start': start,
+            'completion': completion,
+            'waiting': patient.waiting_time,
+            'priority': priority,
+            'doctor': doctor
+        }
+
+        with self.lock:
+            if self.size == len(self.completion):
+                self._grow()
+            # Keep the columns sorted by completion so windows are a searchsorted slice;
+            # late arrivals shift the newer rows up by one
+            i = self.size
+            if self.size and completion < self.completion[self.size - 1]:
+                i = int(np.searchsorted(self.completion[:self.size], completion, side='right'))
+            for name, value in row.items():
+                column = getattr(self, name)
+                column[i + 1:self.size + 1] = column[i:self.size]
+                column[i] = value
+            self.size += 1
+
+            self._ensure_hour(int(start // HOUR))
+            self._ensure_hour(int(completion // HOUR))
+            self.hourly_completions[int(completion // HOUR) - self.base_hour, priority] += 1
+            # Busy time attributed to every hour the treatment overlaps
+            hour = int(start // HOUR)
+            while start < completion:
+                hour_end = min((hour + 1) * HOUR, completion)
+                self.hourly_busy[hour - self.base_hour, doctor] += hour_end - start
+                start = hour_end
+                hour += 1
+        return True
+
+    def query(self, window_hours=24, now=None):
+        """Aggregates over the last window_hours whole hours (including the current one)"""
+        now = now if now is not None else time.time()
+        current_hour = int(now // HOUR)
+        window_hours = min(max(1, int(window_hours)), MAX_WINDOW_HOURS)
+        first_hour = current_hour - window_hours + 1
+
+        with self.lock:
+            key = (window_hours, current_hour, self.size)
+            cached = self.cache.get(window_hours)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+            result = {
+                'window_hours': window_hours,
+                'window_start': first_hour * HOUR,
+                'window_end': (current_hour + 1) * HOUR,
+                'wait_by_priority': self._wait_percentiles(first_hour * HOUR),
+                'hourly_throughput': self._hourly_throughput(first_hour, current_hour),
+                'doctor_utilization': self._utilization(first_hour, current_hour, now)
+            }
+            result['completed'] = int(sum(row['count'] for row in result['hourly_throughput']))
+            if window_hours not in self.cache and len(self.cache) >= MAX_CACHED_WINDOWS:
+                del self.cache[next(iter(self.cache))]
+            self.cache[window_hours] = (key, result)
+            return result
+
+    def _wait_percentiles(self, window_start):
+        lo = int(np.searchsorted(self.completion[:self.size], window_start, side='left'))
+        waits = self.waiting[lo:self.size]
+        priorities = self.priority[lo:self.size]
+        stats = {}
+        for priority in range(NUM_PRIORITIES):
+            values = waits[priorities == priority]
+            if len(values) == 0:
+                stats[priority] = {'count': 0}
+                continue
+            pcts = np.percentile(values, PERCENTILES)
+            stats[priority] = {'count': int(len(values)), 'mean_seconds': round(float(values.mean()), 1)}
+            stats[priority].update({f"p{p}_seconds": round(float(v), 1) for p, v in zip(PERCENTILES, pcts)})
+        return stats
+
+    def _hour_rows(self, first_hour, last_hour):
+        if self.base_hour is None:
+            return None
+        lo = max(first_hour - self.base_hour, 0)
+        hi = min(last_hour - self.base_hour + 1, len(self.hourly_completions))
+        return (lo, hi) if lo < hi else None
+
+    def _hourly_throughput(self, first_hour, last_hour):
+        """Per-hour completions from the first recorded hour (or window start) onward"""
+        if self.base_hour is None:
+            return []
+        first_hour = max(first_hour, self.base_hour)
+        if first_hour > last_hour:
+            return []
+        counts = np.zeros((last_hour - first_hour + 1, NUM_PRIORITIES), dtype=np.int64)
+        lo = first_hour - self.base_hour
+        hi = min(last_hour - self.base_hour + 1, len(self.hourly_completions))
+        if lo < hi:
+            counts[:hi - lo] = self.hourly_completions[lo:hi]
+        totals = counts.sum(axis=1)
+        return [{'hour': (first_hour + i) * HOUR, 'count': int(totals[i]),
+                 'by_priority': [int(c) for c in counts[i]]} for i in range(len(counts))]
+
+    def _utilization(self, first_hour, last_hour, now):
+        rows = self._hour_rows(first_hour, last_hour)
+        busy = self.hourly_busy[rows[0]:rows[1]].sum(axis=0) if rows is not None else np.zeros(len(self.doctor_ids))
+        # The current hour only counts as elapsed so far
+        elapsed = max((last_hour - first_hour) * HOUR + (now - last_hour * HOUR), 1.0)
+        return {doctor_id: {'busy_minutes': round(float(busy[idx]) / 60, 1),
+                            'utilization_pct': round(100.0 * min(float(busy[idx]) / elapsed, 1.0), 1)}
+                for idx, doctor_id in enumerate(self.doctor_ids)}
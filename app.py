@@ -1,15 +1,21 @@
 #!/usr/bin/env python3
 """Hospital OS - v10 with Fixed Resource Deallocation"""
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g
+import atexit
 import os
+import time
 from datetime import datetime
 import traceback
 from patient import Patient
-from predictor import HealthPredictor
+from predictor import HealthPredictor, MODEL_LOADING
 from scheduler import MultiDoctorScheduler
 from resource_manager import ResourceManager
-from process_sync import ProcessSynchronization
+from process_sync import ProcessSynchronization, lock_monitor
+from response_cache import CachedPayload, PayloadCache
+from vitals_stream import VitalsStream
+from analytics_store import TreatmentAnalytics, MAX_WINDOW_HOURS
+from request_capture import RequestCapture, capture_entry
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 
@@ -17,8 +23,17 @@ scheduler = None
 resource_manager = None
 predictor = None
 sync_manager = None
+vitals_stream = None
+analytics = None
+request_capture = None
 patient_counter = 0
 
+# Status views are kept as encoded JSON and rebuilt only when state changes
+schedule_payload = CachedPayload()
+# Paginated / single-doctor / delta views of the schedule, per query
+queue_view_payloads = PayloadCache(max_entries=64)
+resources_payload = CachedPayload()
+
 VALID_RANGES = {
     'heartRate': (40, 200),
     'oxygenSat': (70, 100),
@@ -27,29 +42,124 @@ VALID_RANGES = {
     'respRate': (8, 40)
 }
 
+PRIORITY_LEVELS = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+
+# Upper bound for long-poll allocation requests
+MAX_ALLOCATION_WAIT_SECONDS = 60
+
 def get_priority_label(priority_num):
     """Convert priority number to label"""
     priority_map = {0: "CRITICAL", 1: "HIGH", 2: "MEDIUM", 3: "LOW"}
     return priority_map.get(priority_num, "LOW")
 
+def cached_json_response(payload, key, build):
+    """Serve a CachedPayload body, gzip/deflate-compressed when the client accepts it"""
+    body, encoding = payload.get_encoded(key, build, request.headers.get('Accept-Encoding'))
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def find_patient_priority(patient_id):
+    """Priority of a patient in treatment or waiting, LOW if unknown"""
+    patient, _ = scheduler.find_patient(patient_id)
+    if patient is None or patient.status == 'COMPLETED' or not isinstance(patient.priority, int):
+        return PRIORITY_LEVELS["LOW"]
+    return patient.priority
+
+def patient_summary(patient):
+    """JSON view of a registry patient"""
+    return {
+        'id': patient.patient_id,
+        'name': patient.name,
+        'status': patient.status,
+        'priority': patient.priority,
+        'priority_label': get_priority_label(patient.priority),
+        'burst_time': patient.burst_time,
+        'assigned_doctor': getattr(patient, 'assigned_doctor', None),
+        'arrival_time': patient.arrival_time.isoformat() if patient.arrival_time else None,
+        'start_time': patient.start_time.isoformat() if patient.start_time else None,
+        'completion_time': patient.completion_time.isoformat() if patient.completion_time else None,
+        'waiting_time': patient.waiting_time
+    }
+
+def allocate_with_wait(pool, data, allocate):
+    """Run allocate(), or long-poll the pool's priority wait queue when wait_seconds is given"""
+    try:
+        wait_seconds = min(float(data.get('wait_seconds') or 0), MAX_ALLOCATION_WAIT_SECONDS)
+    except (ValueError, TypeError):
+        return False, 'wait_seconds must be a number', None
+    if not wait_seconds > 0:
+        return allocate()
+    patient_id = data.get('patient_id')
+    priority = data.get('priority')
+    if priority is None:
+        priority = find_patient_priority(patient_id)
+    elif str(priority).upper() in PRIORITY_LEVELS:
+        priority = PRIORITY_LEVELS[str(priority).upper()]
+    else:
+        try:
+            priority = int(priority)
+        except (ValueError, TypeError):
+            priority = None
+        if priority not in PRIORITY_LEVELS.values():
+            return False, 'Priority must be 0-3 or CRITICAL/HIGH/MEDIUM/LOW', None
+    return resource_manager.allocate_waiting(pool, patient_id, data.get('doctor_id'), priority=priority,
+                                             timeout=wait_seconds, notes=data.get('notes', ''),
+                                             lease_minutes=data.get('lease_minutes'))
+
+def start_request_capture(path=None):
+    """Log every /api/ request to JSONL (path defaults to $HOSPITAL_OS_CAPTURE)"""
+    global request_capture
+    path = path or os.environ.get('HOSPITAL_OS_CAPTURE')
+    if path and request_capture is None:
+        request_capture = RequestCapture(path)
+        # Flush entries still queued for the writer thread on shutdown
+        atexit.register(request_capture.close)
+        print(f" ✓ Capturing API requests to {path}")
+    return request_capture
+
+@app.before_request
+def capture_start():
+    if request_capture is not None:
+        g.capture_started = time.time()
+
+@app.after_request
+def capture_request(response):
+    if request_capture is not None and request.path.startswith('/api/') and 'capture_started' in g:
+        request_capture.record(capture_entry(request, response, g.capture_started))
+    return response
+
 def initialize_system():
     """Initialize system"""
-    global scheduler, resource_manager, predictor, sync_manager
+    global scheduler, resource_manager, predictor, sync_manager, vitals_stream, analytics
     print("🏥 Initializing Hospital OS System...")
     try:
         print(" → Loading HealthPredictor...")
         predictor = HealthPredictor()
         predictor.load_models()
-        print(" ✓ HealthPredictor loaded")
+        print(f" ✓ HealthPredictor ready (model loading: {MODEL_LOADING})")
         print(" → Creating MultiDoctorScheduler...")
         scheduler = MultiDoctorScheduler(num_doctors=3, algorithm='priority')
         print(" ✓ MultiDoctorScheduler created")
         print(" → Creating ResourceManager...")
         resource_manager = ResourceManager(num_beds=10, num_operation_rooms=3, num_ventilators=5, num_monitors=10)
+        resource_manager.start_lease_reaper()
+        scheduler.add_discharge_hook(lambda patient, doctor_id: resource_manager.release_patient_resources(patient.patient_id, doctor_id))
         print(" ✓ ResourceManager created")
+        print(" → Creating VitalsStream...")
+        vitals_stream = VitalsStream(scheduler, resource_manager, valid_ranges=VALID_RANGES)
+        scheduler.add_discharge_hook(lambda patient, doctor_id: vitals_stream.forget(patient.patient_id))
+        print(" ✓ VitalsStream created")
+        print(" → Creating TreatmentAnalytics...")
+        analytics = TreatmentAnalytics(doctor.doctor_id for doctor in scheduler.doctors)
+        scheduler.add_discharge_hook(lambda patient, doctor_id: analytics.record(patient, doctor_id) if patient.status == 'COMPLETED' else None)
+        print(" ✓ TreatmentAnalytics created")
         print(" → Creating ProcessSynchronization...")
         sync_manager = ProcessSynchronization(num_doctors=3)
         print(" ✓ ProcessSynchronization created")
+        start_request_capture()
         print("✓ System initialized successfully!")
         return True
     except Exception as e:
@@ -170,22 +280,69 @@ def register_patient():
 def get_schedule():
     try:
         scheduler.update_all_doctors()
-        all_doctors = scheduler.get_all_doctors_status()
-
-        for doctor_status in all_doctors:
-            if doctor_status['current_patient']:
-                doctor_status['current_patient']['priority_label'] = get_priority_label(doctor_status['current_patient']['priority'])
-
-            for patient in doctor_status['waiting_queue']:
-                patient['priority_label'] = get_priority_label(patient['priority'])
+        doctor_id = request.args.get('doctor_id')
+        offset = request.args.get('offset', type=int)
+        limit = request.args.get('limit', type=int)
+        since = request.args.get('since')
+        # Remaining/wait times are refreshed at one-second resolution
+        key = (scheduler.get_state_version(), int(time.time()))
+        if doctor_id is None and offset is None and limit is None and since is None:
+            return cached_json_response(schedule_payload, key, lambda: {
+                'success': True,
+                'doctors': scheduler.get_all_doctors_status(),
+                'version': scheduler.get_queue_version(),
+                'overall_stats': scheduler.get_overall_statistics()
+            })
+
+        # Paginated (?offset=&limit=) and delta (?since=<version>) views
+        if doctor_id is not None and doctor_id not in scheduler.doctors_by_id:
+            return jsonify({'success': False, 'error': f'Unknown doctor {doctor_id}'})
+        def build():
+            doctors, version = scheduler.get_queue_views([doctor_id] if doctor_id else None,
+                                                         offset=offset or 0, limit=limit, since=since)
+            return {
+                'success': True,
+                'doctors': doctors,
+                'version': version,
+                'overall_stats': scheduler.get_overall_statistics()
+            }
+        # Pollers that are up to date send the same since token, so they share one payload
+        view = (doctor_id, offset, limit, since)
+        return cached_json_response(queue_view_payloads.payload(view), key, build)
+    except Exception as e:
+        print(f"Schedule error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/estimate-wait', methods=['GET', 'POST'])
+def estimate_wait():
+    """Where a new patient would land at each doctor and how long they would wait"""
+    try:
+        data = request.get_json(silent=True) or request.args.to_dict()
+        priority = data.get('priority')
+        if priority is None:
+            errors = validate_input(data)
+            if errors:
+                return jsonify({'success': False, 'error': ' | '.join(errors)})
+            priority, _, _ = predictor.predict(data)
+        elif str(priority).upper() in PRIORITY_LEVELS:
+            priority = PRIORITY_LEVELS[str(priority).upper()]
+        else:
+            priority = int(priority)
+            if priority not in PRIORITY_LEVELS.values():
+                return jsonify({'success': False, 'error': 'Priority must be 0-3 or CRITICAL/HIGH/MEDIUM/LOW'})
+
+        estimates = scheduler.estimate_insert_wait(priority)
         return jsonify({
             'success': True,
-            'doctors': all_doctors,
-            'overall_stats': scheduler.get_overall_statistics()
+            'priority': priority,
+            'priority_label': get_priority_label(priority),
+            'estimates': estimates,
+            'recommended_doctor_num': estimates[0]['doctor_num']
         })
+    except (ValueError, TypeError):
+        return jsonify({'success': False, 'error': 'Priority must be 0-3 or CRITICAL/HIGH/MEDIUM/LOW'})
     except Exception as e:
-        print(f"Schedule error: {e}")
+        print(f"Estimate error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/demo', methods=['GET'])
@@ -237,7 +394,11 @@ def reset_system():
     try:
         patient_counter = 0
         scheduler.reset_all()
-        return jsonify({'success': True})
+        vitals_stream.reset()
+        analytics.clear()
+        # Patient IDs restart from P001, so nothing may stay allocated to the old ones
+        released = resource_manager.release_all()
+        return jsonify({'success': True, 'released_resources': released})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -248,8 +409,9 @@ def get_resources_status():
         if not resource_manager:
             return jsonify({'success': False, 'error': 'Resource manager not initialized'})
 
-        status = resource_manager.get_status()
-        return jsonify({'success': True, 'data': status})
+        # 'timestamp' is the time the status last changed
+        return cached_json_response(resources_payload, resource_manager.get_state_version(),
+                                    lambda: {'success': True, 'data': resource_manager.get_status()})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
@@ -261,8 +423,9 @@ def allocate_bed():
         patient_id = data.get('patient_id')
         doctor_id = data.get('doctor_id')
         notes = data.get('notes', '')
+        lease_minutes = data.get('lease_minutes')
 
-        success, msg, bed_id = resource_manager.allocate_bed(patient_id, doctor_id, notes)
+        success, msg, bed_id = allocate_with_wait('beds', data, lambda: resource_manager.allocate_bed(patient_id, doctor_id, notes, lease_minutes))
 
         return jsonify({
             'success': success,
@@ -303,8 +466,9 @@ def allocate_operation_room():
         patient_id = data.get('patient_id')
         doctor_id = data.get('doctor_id')
         notes = data.get('notes', '')
+        lease_minutes = data.get('lease_minutes')
 
-        success, msg, or_id = resource_manager.allocate_operation_room(patient_id, doctor_id, notes)
+        success, msg, or_id = resource_manager.allocate_operation_room(patient_id, doctor_id, notes, lease_minutes)
 
         return jsonify({
             'success': success,
@@ -337,6 +501,105 @@ def deallocate_operation_room():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def parse_time(value):
+    """ISO datetime string -> timestamp (None passes through)"""
+    if value in (None, ''):
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+@app.route('/api/resources/or/book', methods=['POST'])
+def book_operation_room():
+    """Book an operation room for a future slot (earliest free slot if no start given)"""
+    try:
+        data = request.json
+        patient_id = data.get('patient_id')
+        doctor_id = data.get('doctor_id')
+        duration = data.get('duration_minutes')
+        if not patient_id or not duration:
+            return jsonify({'success': False, 'error': 'patient_id and duration_minutes are required'})
+
+        success, msg, reservation = resource_manager.book_operation_room(
+            patient_id, doctor_id, float(duration), start=parse_time(data.get('start')),
+            or_id=data.get('or_id') or None, notes=data.get('notes', ''), hold_minutes=data.get('hold_minutes'))
+
+        return jsonify({
+            'success': success,
+            'message': msg,
+            'reservation': reservation.to_dict() if reservation else None,
+            'timestamp': datetime.now().isoformat()
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f"Invalid time or duration: {e}"})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/or/cancel', methods=['POST'])
+def cancel_operation_room_booking():
+    """Cancel an operation room booking"""
+    try:
+        reservation_id = request.json.get('reservation_id')
+        if not reservation_id:
+            return jsonify({'success': False, 'error': 'Reservation ID is required'})
+
+        success, msg, _ = resource_manager.cancel_operation_room_booking(reservation_id)
+        return jsonify({'success': success, 'message': msg, 'timestamp': datetime.now().isoformat()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/or/confirm', methods=['POST'])
+def confirm_operation_room_booking():
+    """Confirm a held operation room booking before it expires"""
+    try:
+        reservation_id = request.json.get('reservation_id')
+        if not reservation_id:
+            return jsonify({'success': False, 'error': 'Reservation ID is required'})
+
+        success, msg, reservation = resource_manager.confirm_operation_room_booking(reservation_id)
+        return jsonify({
+            'success': success,
+            'message': msg,
+            'reservation': reservation.to_dict() if reservation else None,
+            'timestamp': datetime.now().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/or/earliest-slot', methods=['GET'])
+def find_operation_room_slot():
+    """Earliest free slot of a given duration across all (or one) operation rooms"""
+    try:
+        duration = float(request.args.get('duration_minutes', 0))
+        if duration <= 0:
+            return jsonify({'success': False, 'error': 'duration_minutes must be positive'})
+
+        slot = resource_manager.find_operation_room_slot(
+            duration, after=parse_time(request.args.get('after')), or_id=request.args.get('or_id') or None)
+        if slot is None:
+            return jsonify({'success': False, 'error': 'All operation rooms are in use with no lease end; allocate with lease_minutes to make them bookable'})
+        or_id, start = slot
+        return jsonify({
+            'success': True,
+            'or_id': or_id,
+            'start': datetime.fromtimestamp(start).isoformat(),
+            'end': datetime.fromtimestamp(start + duration * 60).isoformat()
+        })
+    except (ValueError, KeyError) as e:
+        return jsonify({'success': False, 'error': f"Invalid request: {e}"})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/or/bookings', methods=['GET'])
+def get_operation_room_bookings():
+    """List operation room bookings, optionally for one room and a time window"""
+    try:
+        bookings = resource_manager.get_operation_room_bookings(
+            request.args.get('or_id') or None, parse_time(request.args.get('start')), parse_time(request.args.get('end')))
+        return jsonify({'success': True, 'bookings': bookings})
+    except (ValueError, KeyError) as e:
+        return jsonify({'success': False, 'error': f"Invalid request: {e}"})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/resources/allocate-ventilator', methods=['POST'])
 def allocate_ventilator():
     """Allocate ventilator"""
@@ -344,8 +607,9 @@ def allocate_ventilator():
         data = request.json
         patient_id = data.get('patient_id')
         doctor_id = data.get('doctor_id')
+        lease_minutes = data.get('lease_minutes')
 
-        success, msg, vent_id = resource_manager.allocate_ventilator(patient_id, doctor_id)
+        success, msg, vent_id = allocate_with_wait('ventilators', data, lambda: resource_manager.allocate_ventilator(patient_id, doctor_id, lease_minutes))
 
         return jsonify({
             'success': success,
@@ -385,8 +649,9 @@ def allocate_monitor():
         data = request.json
         patient_id = data.get('patient_id')
         doctor_id = data.get('doctor_id')
+        lease_minutes = data.get('lease_minutes')
 
-        success, msg, mon_id = resource_manager.allocate_monitor(patient_id, doctor_id)
+        success, msg, mon_id = allocate_with_wait('monitors', data, lambda: resource_manager.allocate_monitor(patient_id, doctor_id, lease_minutes))
 
         return jsonify({
             'success': success,
@@ -419,6 +684,146 @@ def deallocate_monitor():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/resources/renew-lease', methods=['POST'])
+def renew_resource_lease():
+    """Extend the lease on an allocated resource"""
+    try:
+        data = request.json
+        resource_id = data.get('resource_id')
+        lease_minutes = data.get('lease_minutes')
+        if not resource_id or not lease_minutes:
+            return jsonify({'success': False, 'error': 'resource_id and lease_minutes are required'})
+
+        success, msg, expires = resource_manager.renew_lease(resource_id, lease_minutes)
+        return jsonify({'success': success, 'message': msg, 'lease_expires': expires, 'timestamp': datetime.now().isoformat()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/release-patient', methods=['POST'])
+def release_patient_resources():
+    """Release every resource held by a patient (discharge)"""
+    try:
+        data = request.json
+        patient_id = data.get('patient_id')
+        if not patient_id:
+            return jsonify({'success': False, 'error': 'Patient ID is required'})
+
+        released = resource_manager.release_patient_resources(patient_id, data.get('doctor_id'))
+        return jsonify({'success': True, 'released': released, 'timestamp': datetime.now().isoformat()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/wait-queues', methods=['GET'])
+def get_wait_queues():
+    """Patients blocked waiting for beds, ventilators and monitors"""
+    try:
+        return jsonify({'success': True, 'queues': resource_manager.get_wait_queues()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/resources/utilization', methods=['GET'])
+def get_resource_utilization():
+    """Pool utilization and capacity reclaimed by leases and discharge"""
+    try:
+        return jsonify({'success': True, 'data': resource_manager.get_utilization()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/patients/search', methods=['GET'])
+def search_patients():
+    """Search patients by name, status, priority and doctor"""
+    try:
+        priority = request.args.get('priority')
+        if priority is not None and priority != '':
+            priority = PRIORITY_LEVELS[priority.upper()] if priority.upper() in PRIORITY_LEVELS else int(priority)
+        else:
+            priority = None
+        status = request.args.get('status')
+        limit = min(int(request.args.get('limit', 50)), 500)
+        if limit < 1:
+            return jsonify({'success': False, 'error': 'limit must be at least 1'})
+
+        patients = scheduler.registry.search(request.args.get('q'), status=status.upper() if status else None,
+                                             priority=priority, doctor_id=request.args.get('doctor') or None, limit=limit)
+        return jsonify({'success': True, 'patients': [patient_summary(p) for p in patients], 'count': len(patients)})
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': f"Invalid filter: {e}"})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/patients/<patient_id>', methods=['GET'])
+def get_patient(patient_id):
+    """Patient details, queue position, estimated wait and resources"""
+    try:
+        patient, doctor = scheduler.find_patient(patient_id)
+        if patient is None:
+            return jsonify({'success': False, 'error': f"Patient {patient_id} not found"})
+
+        info = patient_summary(patient)
+        if patient.status == 'WAITING' and doctor is not None:
+            position = doctor.queue_index.position_of(patient_id)
+            if position is not None:
+                wait_seconds = doctor.estimate_wait(position)
+                info['queue_position'] = position + 1
+                info['wait_time_seconds'] = int(wait_seconds)
+                info['wait_time_minutes'] = round(wait_seconds / 60, 1)
+        info['resources'] = resource_manager.get_patient_resources(patient_id)
+        return jsonify({'success': True, 'patient': info})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/analytics', methods=['GET'])
+def get_analytics():
+    """Wait percentiles by priority, doctor utilization and hourly throughput over a rolling window"""
+    try:
+        window_hours = int(request.args.get('window_hours', 24))
+        if window_hours < 1 or window_hours > MAX_WINDOW_HOURS:
+            return jsonify({'success': False, 'error': f'window_hours must be between 1 and {MAX_WINDOW_HOURS}'})
+
+        result = dict(analytics.query(window_hours))
+        result['window_start'] = datetime.fromtimestamp(result['window_start']).isoformat()
+        result['window_end'] = datetime.fromtimestamp(result['window_end']).isoformat()
+        result['hourly_throughput'] = [dict(row, hour=datetime.fromtimestamp(row['hour']).isoformat())
+                                       for row in result['hourly_throughput']]
+        result['wait_by_priority'] = {get_priority_label(p): stats for p, stats in result['wait_by_priority'].items()}
+        return jsonify({'success': True, 'data': result})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f"Invalid window: {e}"})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/vitals/stream', methods=['POST'])
+def ingest_vitals():
+    """Ingest bedside monitor samples and re-triage patients whose band changes"""
+    try:
+        data = request.get_json(silent=True)
+        samples = data.get('samples') if isinstance(data, dict) else data
+        if not isinstance(samples, list) or not samples:
+            return jsonify({'success': False, 'error': 'Expected a non-empty list of samples'})
+
+        results = vitals_stream.ingest_samples(samples)
+        return jsonify({
+            'success': True,
+            'accepted': sum(r['accepted'] for r in results),
+            'retriaged': [r for r in results if 'retriaged_from' in r],
+            'rejected': [r for r in results if 'error' in r or r.get('rejected')]
+        })
+    except (KeyError, ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': f"Invalid sample: {e}"})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/vitals/<patient_id>', methods=['GET'])
+def get_patient_vitals(patient_id):
+    """Recent streamed vitals for a patient"""
+    try:
+        vitals = vitals_stream.get_patient_vitals(patient_id, int(request.args.get('n', 60)))
+        if vitals is None:
+            return jsonify({'success': False, 'error': f"No streamed vitals for {patient_id}"})
+        return jsonify({'success': True, 'vitals': vitals})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/patient/<patient_id>/resources', methods=['GET'])
 def get_patient_resources(patient_id):
     """Get all resources allocated to a patient"""
@@ -428,6 +833,16 @@ def get_patient_resources(patient_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/debug/locks', methods=['GET'])
+def get_lock_report():
+    """Lock contention stats, wait-for graph and lock-order inversions"""
+    try:
+        if request.args.get('reset') == '1':
+            lock_monitor.reset_stats()
+        return jsonify({'success': True, 'data': lock_monitor.snapshot()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 if __name__ == '__main__':
     os.makedirs('templates', exist_ok=True)
     os.makedirs('static', exist_ok=True)
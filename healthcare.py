@@ -1,2 +1 @@
 """Healthcare Utilities"""
-print("Healthcare module loaded")
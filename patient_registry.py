@@ -0,0 +1,128 @@
+"""Patient Registry - indexed lookup across queues, treatment and history"""
+import threading
+
+
+def _name_grams(name):
+    """Trigrams of the lowered name plus '^'-marked word prefixes of length 1-2"""
+    name = name.lower()
+    grams = {name[i:i + 3] for i in range(len(name) - 2)}
+    for word in name.split():
+        grams.update('^' + word[:n] for n in (1, 2) if len(word) >= n)
+    return grams
+
+
+class PatientRegistry:
+    """Central index of every patient the scheduler has seen.
+
+    Patients are stored once under a dense integer key. Lookups by id are a
+    dict hit; names are indexed by trigram (plus short word prefixes) into
+    append-only posting lists; status and priority keep sets of keys that
+    are moved on every transition.
+    """
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.records = []      # key -> patient
+            self.names = []        # key -> lowered name
+            self.keys = {}         # patient_id -> key
+            self.grams = {}        # trigram / '^' prefix -> [keys]
+            self.by_status = {}    # status -> {keys}
+            self.by_priority = {}  # priority -> {keys}
+            self.indexed = []      # key -> (status, priority) as currently indexed
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, patient):
+        """Register a new patient (or re-register one whose id was reused)"""
+        with self.lock:
+            key = self.keys.get(patient.patient_id)
+            if key is not None:
+                self.records[key] = patient
+                self.reindex(patient)
+                return
+            key = len(self.records)
+            self.records.append(patient)
+            self.names.append((patient.name or '').lower())
+            self.indexed.append((patient.status, patient.priority))
+            self.keys[patient.patient_id] = key
+            for gram in _name_grams(patient.name or ''):
+                self.grams.setdefault(gram, []).append(key)
+            self.by_status.setdefault(patient.status, set()).add(key)
+            self.by_priority.setdefault(patient.priority, set()).add(key)
+
+    def reindex(self, patient, record=None):
+        """Move a patient between status/priority indexes after a transition.
+
+        record replaces the stored object (e.g. the completed copy)."""
+        with self.lock:
+            key = self.keys.get(patient.patient_id)
+            if key is None:
+                return False
+            if record is not None:
+                self.records[key] = record
+            old_status, old_priority = self.indexed[key]
+            if old_status != patient.status:
+                self.by_status[old_status].discard(key)
+                self.by_status.setdefault(patient.status, set()).add(key)
+            if old_priority != patient.priority:
+                self.by_priority[old_priority].discard(key)
+                self.by_priority.setdefault(patient.priority, set()).add(key)
+            self.indexed[key] = (patient.status, patient.priority)
+            return True
+
+    def get(self, patient_id):
+        with self.lock:
+            key = self.keys.get(patient_id)
+            return self.records[key] if key is not None else None
+
+    def search(self, query=None, status=None, priority=None, doctor_id=None, limit=50):
+        """Patients matching a name substring (prefix for 1-2 letters) and filters, newest first"""
+        if limit < 1:
+            return []
+        with self.lock:
+            candidates = None
+            query = (query or '').strip().lower()
+            if query:
+                if len(query) < 3:
+                    postings = [self.grams.get('^' + query, [])]
+                else:
+                    postings = [self.grams.get(query[i:i + 3], []) for i in range(len(query) - 2)]
+                candidates = reversed(min(postings, key=len))
+            filter_sets = []
+            if status is not None:
+                filter_sets.append(self.by_status.get(status, set()))
+            if priority is not None:
+                filter_sets.append(self.by_priority.get(priority, set()))
+            if candidates is None:
+                smallest = min(filter_sets, key=len) if filter_sets else None
+                if smallest is not None and len(smallest) <= 4096:
+                    candidates = sorted(smallest, reverse=True)
+                else:
+                    # Large sets: walk newest-first and let the membership checks filter
+                    candidates = range(len(self.records) - 1, -1, -1)
+
+            results = []
+            for key in candidates:
+                if len(query) >= 3 and query not in self.names[key]:
+                    continue
+                if any(key not in keys for keys in filter_sets):
+                    continue
+                patient = self.records[key]
+                if doctor_id is not None and getattr(patient, 'assigned_doctor', None) != doctor_id:
+                    continue
+                results.append(patient)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def counts(self):
+        with self.lock:
+            return {
+                'total': len(self.keys),
+                'by_status': {status: len(keys) for status, keys in self.by_status.items() if keys},
+                'by_priority': {str(priority): len(keys) for priority, keys in self.by_priority.items() if keys}
+            }
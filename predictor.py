@@ -1,60 +1,109 @@
 """Health Predictor Module - ML-based Priority Prediction"""
-import joblib
+import json
 import os
+import threading
+import time
+
+# 'eager' loads the joblib models at startup, 'lazy' on first use,
+# 'background' in a daemon thread right after startup
+MODEL_LOADING = os.environ.get("HOSPITAL_OS_MODEL_LOADING", "lazy")
+
+# Artifacts live next to this module, whatever the working directory
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+RISK_MODEL_PATH = os.path.join(MODEL_DIR, "risk_model.joblib")
+LABEL_ENCODER_PATH = os.path.join(MODEL_DIR, "label_encoder.joblib")
+# Written by train_models.py next to the artifacts
+MANIFEST_PATH = os.path.join(MODEL_DIR, "model_manifest.json")
 
 class HealthPredictor:
     def __init__(self):
-        self.risk_model = None
-        self.label_encoder = None
+        self._risk_model = None
+        self._label_encoder = None
         self.models_loaded = False
+        self.load_seconds = None
+        self.model_version = None
+        self._load_lock = threading.Lock()
         self.priority_mapping = {0: "CRITICAL", 1: "HIGH", 2: "MEDIUM", 3: "LOW"}
 
-    def load_models(self):
-        try:
-            if os.path.exists("risk_model.joblib"):
-                self.risk_model = joblib.load("risk_model.joblib")
-                self.label_encoder = joblib.load("label_encoder.joblib")
-                self.models_loaded = True
+    def load_models(self, mode=None):
+        """Load (or schedule loading of) the joblib models according to mode"""
+        mode = mode or MODEL_LOADING
+        if mode == "lazy":
+            return os.path.exists(RISK_MODEL_PATH)
+        if mode == "background":
+            threading.Thread(target=self._load, name="model-warmup", daemon=True).start()
+            return True
+        return self._load()
+
+    def _load(self):
+        with self._load_lock:
+            if self.models_loaded:
                 return True
-        except:
-            pass
-        return False
+            try:
+                if os.path.exists(RISK_MODEL_PATH):
+                    # joblib (and sklearn via unpickling) are only imported here
+                    import joblib
+                    start = time.perf_counter()
+                    manifest = {}
+                    if os.path.exists(MANIFEST_PATH):
+                        with open(MANIFEST_PATH, encoding="utf-8") as f:
+                            manifest = json.load(f)
+                    self.model_version = manifest.get("version")
+                    self._risk_model = joblib.load(RISK_MODEL_PATH)
+                    self._label_encoder = joblib.load(LABEL_ENCODER_PATH)
+                    self.load_seconds = time.perf_counter() - start
+                    self.models_loaded = True
+                    return True
+            except:
+                pass
+            return False
+
+    @property
+    def risk_model(self):
+        if not self.models_loaded:
+            self._load()
+        return self._risk_model
+
+    @property
+    def label_encoder(self):
+        if not self.models_loaded:
+            self._load()
+        return self._label_encoder
 
     def predict(self, patient_data):
         """Predict priority and burst time"""
-        score = 0
         try:
-            o2_sat = float(patient_data.get('oxygenSat', 95))
-            if o2_sat < 85: score += 10
-            elif o2_sat < 95: score += 5
-            else: score += 2
-
-            hr = float(patient_data.get('heartRate', 75))
-            if hr > 130: score += 7
-            elif hr > 110: score += 4
-            else: score += 1
-
-            temp = float(patient_data.get('temperature', patient_data.get('tempF', 98.6)))
-            if temp > 100: score += 5
-            elif temp > 99: score += 3
-            else: score += 1
-
-            bp = float(patient_data.get('systolicBP', 120))
-            if bp > 150 or bp < 90: score += 5
-
-            rr = float(patient_data.get('respRate', 18))
-            if rr > 30: score += 5
-            elif rr > 24: score += 3
+            score = vital_score(
+                float(patient_data.get('oxygenSat', 95)),
+                float(patient_data.get('heartRate', 75)),
+                float(patient_data.get('temperature', patient_data.get('tempF', 98.6))),
+                float(patient_data.get('systolicBP', 120)),
+                float(patient_data.get('respRate', 18))
+            )
         except (ValueError, TypeError):
             score = 1
 
-        if score >= 20:
-            priority, risk_label, burst_time = 0, "CRITICAL", 20
-        elif score >= 10:
-            priority, risk_label, burst_time = 1, "HIGH", 15
-        elif score >= 5:
-            priority, risk_label, burst_time = 2, "MEDIUM", 10
-        else:
-            priority, risk_label, burst_time = 3, "LOW", 5
+        return priority_for_score(score)
+
+
+# Score cut-offs for CRITICAL, HIGH and MEDIUM; anything lower is LOW
+SCORE_CUTOFFS = (20, 10, 5)
+PRIORITY_BANDS = ((0, 20, "CRITICAL"), (1, 15, "HIGH"), (2, 10, "MEDIUM"), (3, 5, "LOW"))
+
+def vital_score(o2_sat, hr, temp, bp, rr):
+    """Triage score from vitals; works element-wise on numpy arrays as well as on floats"""
+    return (
+        (o2_sat < 85) * 10 + ((o2_sat >= 85) & (o2_sat < 95)) * 5 + (o2_sat >= 95) * 2
+        + (hr > 130) * 7 + ((hr > 110) & (hr <= 130)) * 4 + (hr <= 110) * 1
+        + (temp > 100) * 5 + ((temp > 99) & (temp <= 100)) * 3 + (temp <= 99) * 1
+        + ((bp > 150) | (bp < 90)) * 5
+        + (rr > 30) * 5 + ((rr > 24) & (rr <= 30)) * 3
+    )
 
-        return priority, burst_time, risk_label
+def priority_for_score(score):
+    """(priority, burst_time, risk_label) for a triage score"""
+    for cutoff, (priority, burst_time, risk_label) in zip(SCORE_CUTOFFS, PRIORITY_BANDS):
+        if score >= cutoff:
+            return priority, burst_time, risk_label
+    priority, burst_time, risk_label = PRIORITY_BANDS[-1]
+    return priority, burst_time, risk_label
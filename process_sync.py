@@ -1,9 +1,323 @@
 """Process Synchronization Module"""
+import heapq
+import itertools
 import threading
+import time
+
+
+class LockMonitor:
+    """Registry of instrumented locks - tracks owners, waiters and acquisition order"""
+    def __init__(self):
+        self._guard = threading.Lock()
+        self.locks = {}
+        self.waiting = {}      # thread ident -> lock name it is blocked on
+        self.held = {}         # thread ident -> list of lock names, outermost first
+        self.thread_names = {}
+        self.order_edges = {}  # (held lock, acquired lock) -> count
+
+    def register(self, lock):
+        with self._guard:
+            self.locks[lock.name] = lock
+
+    def _begin_wait(self, lock, ident):
+        with self._guard:
+            self.waiting[ident] = lock.name
+            self.thread_names[ident] = threading.current_thread().name
+
+    def _acquired(self, lock, ident):
+        with self._guard:
+            self.waiting.pop(ident, None)
+            self.thread_names[ident] = lock.owner_name
+            stack = self.held.setdefault(ident, [])
+            for held_name in stack:
+                if held_name != lock.name:
+                    edge = (held_name, lock.name)
+                    self.order_edges[edge] = self.order_edges.get(edge, 0) + 1
+            stack.append(lock.name)
+
+    def _abandon_wait(self, ident):
+        with self._guard:
+            self.waiting.pop(ident, None)
+            if ident not in self.held:
+                self.thread_names.pop(ident, None)
+
+    def _released(self, lock, ident):
+        with self._guard:
+            stack = self.held.get(ident, [])
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] == lock.name:
+                    del stack[i]
+                    break
+            if not stack:
+                self.held.pop(ident, None)
+                self.thread_names.pop(ident, None)
+
+    def wait_for_graph(self):
+        """Thread -> thread edges: waiter is blocked on a lock owned by holder"""
+        with self._guard:
+            waiting = dict(self.waiting)
+            names = dict(self.thread_names)
+        edges = []
+        for ident, lock_name in waiting.items():
+            lock = self.locks.get(lock_name)
+            owner = lock.owner if lock else None
+            if owner is not None and owner != ident:
+                edges.append({
+                    'waiter': names.get(ident, str(ident)),
+                    'waiter_ident': ident,
+                    'lock': lock_name,
+                    'holder': names.get(owner, str(owner)),
+                    'holder_ident': owner
+                })
+        return edges
+
+    def find_deadlocks(self, edges=None):
+        """Cycles in the wait-for graph (each is a set of deadlocked threads)"""
+        if edges is None:
+            edges = self.wait_for_graph()
+        graph = {e['waiter_ident']: e['holder_ident'] for e in edges}
+        names = {e['waiter_ident']: e['waiter'] for e in edges}
+        cycles = []
+        seen = set()
+        for start in graph:
+            path = []
+            node = start
+            while node in graph and node not in seen and node not in path:
+                path.append(node)
+                node = graph[node]
+            if node in path:
+                cycles.append([names[ident] for ident in path[path.index(node):]])
+            seen.update(path)
+        return cycles
+
+    def find_inversions(self):
+        """Lock pairs that have been acquired in both orders"""
+        with self._guard:
+            edges = dict(self.order_edges)
+        inversions = []
+        for (first, second), count in edges.items():
+            if first < second and (second, first) in edges:
+                inversions.append({
+                    'locks': [first, second],
+                    'forward_count': count,
+                    'reverse_count': edges[(second, first)]
+                })
+        return inversions
+
+    def snapshot(self):
+        """Dump stats, wait-for graph and lock-order inversions"""
+        with self._guard:
+            locks = list(self.locks.values())
+            order = [{'held': a, 'acquired': b, 'count': c} for (a, b), c in self.order_edges.items()]
+        wait_for = self.wait_for_graph()
+        return {
+            'locks': {lock.name: lock.get_stats() for lock in locks},
+            'wait_for_graph': wait_for,
+            'deadlocks': self.find_deadlocks(wait_for),
+            'acquisition_order': order,
+            'inversions': self.find_inversions()
+        }
+
+    def reset_stats(self):
+        with self._guard:
+            locks = list(self.locks.values())
+            self.order_edges = {}
+        for lock in locks:
+            lock.reset_stats()
+
+
+lock_monitor = LockMonitor()
+
+
+class InstrumentedLock:
+    """Lock wrapper recording wait time, hold time, owner and acquisition order"""
+    def __init__(self, name, reentrant=True, monitor=None):
+        self.name = name
+        self._lock = threading.RLock() if reentrant else threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.monitor = monitor if monitor is not None else lock_monitor
+        self.owner = None
+        self.owner_name = None
+        self._depth = 0
+        self._acquired_at = None
+        self.reset_stats()
+        self.monitor.register(self)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.acquisitions = 0
+            self.contended = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.total_hold = 0.0
+            self.max_hold = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        ident = threading.get_ident()
+        if self.owner == ident:
+            # Re-entrant acquire: no wait, no new hold interval
+            self._lock.acquire()
+            self._depth += 1
+            return True
+
+        if self._lock.acquire(blocking=False):
+            wait = 0.0
+        else:
+            if not blocking:
+                return False
+            self.monitor._begin_wait(self, ident)
+            start = time.perf_counter()
+            if not self._lock.acquire(timeout=timeout):
+                self.monitor._abandon_wait(ident)
+                return False
+            wait = time.perf_counter() - start
+
+        self.owner = ident
+        self.owner_name = threading.current_thread().name
+        self._depth = 1
+        self._acquired_at = time.perf_counter()
+        with self._stats_lock:
+            self.acquisitions += 1
+            if wait > 0:
+                self.contended += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        self.monitor._acquired(self, ident)
+        return True
+
+    def release(self):
+        if self.owner != threading.get_ident():
+            raise RuntimeError(f"cannot release un-acquired lock {self.name}")
+        self._depth -= 1
+        if self._depth == 0:
+            hold = time.perf_counter() - self._acquired_at
+            with self._stats_lock:
+                self.total_hold += hold
+                self.max_hold = max(self.max_hold, hold)
+            self.monitor._released(self, self.owner)
+            self.owner = None
+            self.owner_name = None
+            self._acquired_at = None
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def get_stats(self):
+        with self._stats_lock:
+            acquisitions = self.acquisitions
+            return {
+                'acquisitions': acquisitions,
+                'contended': self.contended,
+                'total_wait_ms': round(self.total_wait * 1000, 3),
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'avg_wait_ms': round(self.total_wait * 1000 / acquisitions, 3) if acquisitions else 0.0,
+                'total_hold_ms': round(self.total_hold * 1000, 3),
+                'max_hold_ms': round(self.max_hold * 1000, 3),
+                'avg_hold_ms': round(self.total_hold * 1000 / acquisitions, 3) if acquisitions else 0.0,
+                'owner': self.owner_name,
+                'locked': self.owner is not None
+            }
+
+
+class Waiter:
+    """A blocked allocation request; granted a resource id or cancelled"""
+    def __init__(self, patient_id, doctor_id, priority, notes="", lease_minutes=None):
+        self.patient_id = patient_id
+        self.doctor_id = doctor_id
+        self.priority = priority
+        self.notes = notes
+        self.lease_minutes = lease_minutes
+        self.enqueued_at = time.time()
+        self.resource_id = None
+        self.cancelled = False
+        self.event = threading.Event()
+
+    def grant(self, resource_id):
+        self.resource_id = resource_id
+        self.event.set()
+
+    def cancel(self):
+        self.cancelled = True
+        self.event.set()
+
+    def wait(self, timeout=None):
+        return self.event.wait(timeout)
+
+
+class PriorityWaitQueue:
+    """Waiters ordered by priority (0 = CRITICAL first), then arrival.
+
+    Not synchronized on its own: callers hold the lock of the pool it serves,
+    so a released resource can be handed straight to the head waiter.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.heap = []  # (priority, seq, waiter)
+        self._seq = itertools.count()
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def enqueue(self, patient_id, doctor_id, priority, notes="", lease_minutes=None):
+        priority = priority if isinstance(priority, int) else 3
+        waiter = Waiter(patient_id, doctor_id, priority, notes, lease_minutes)
+        heapq.heappush(self.heap, (priority, next(self._seq), waiter))
+        self.size += 1
+        return waiter
+
+    def pop_next(self):
+        """Remove and return the highest-priority live waiter, or None"""
+        while self.heap:
+            _, _, waiter = heapq.heappop(self.heap)
+            if not waiter.cancelled:
+                self.size -= 1
+                return waiter
+        return None
+
+    def cancel(self, waiter):
+        """Withdraw a waiter (lazily removed from the heap)"""
+        if not waiter.cancelled and waiter.resource_id is None:
+            waiter.cancel()
+            self.size -= 1
+
+    def cancel_patient(self, patient_id):
+        """Withdraw every live waiter of a patient; returns how many"""
+        count = 0
+        for _, _, waiter in self.heap:
+            if waiter.patient_id == patient_id and not waiter.cancelled and waiter.resource_id is None:
+                self.cancel(waiter)
+                count += 1
+        return count
+
+    def cancel_all(self):
+        for _, _, waiter in self.heap:
+            if not waiter.cancelled and waiter.resource_id is None:
+                waiter.cancel()
+        self.heap = []
+        self.size = 0
+
+    def snapshot(self):
+        live = sorted((entry for entry in self.heap if not entry[2].cancelled), key=lambda entry: entry[:2])
+        now = time.time()
+        return [{'patient_id': w.patient_id, 'doctor_id': w.doctor_id, 'priority': w.priority,
+                 'waiting_seconds': round(now - w.enqueued_at, 1), 'position': idx + 1}
+                for idx, (_, _, w) in enumerate(live)]
+
 
 class ProcessSynchronization:
     def __init__(self, num_doctors=3):
         self.num_doctors = num_doctors
         self.semaphore = threading.Semaphore(num_doctors)
-        self.lock = threading.RLock()
+        self.lock = InstrumentedLock("sync.lock")
         self.sync_event = threading.Event()
+        self.monitor = lock_monitor
+
+    def get_lock_report(self):
+        """Lock contention stats plus wait-for graph"""
+        return self.monitor.snapshot()
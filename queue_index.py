@@ -0,0 +1,151 @@
+"""Queue Index - prefix sums of burst times over the priority-ordered queue"""
+
+
+class FenwickTree:
+    """Binary indexed tree over a growable array (point update, prefix sum)"""
+    def __init__(self, capacity=64):
+        self.values = [0] * capacity
+        self.tree = [0] * (capacity + 1)
+
+    def _grow(self, min_size):
+        capacity = len(self.values)
+        while capacity < min_size:
+            capacity *= 2
+        self.values.extend([0] * (capacity - len(self.values)))
+        # Rebuild in O(n)
+        self.tree = [0] + list(self.values)
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                self.tree[parent] += self.tree[i]
+
+    def add(self, index, delta):
+        if index >= len(self.values):
+            self._grow(index + 1)
+        self.values[index] += delta
+        i = index + 1
+        size = len(self.tree)
+        while i < size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        """Sum of values[0:count]"""
+        total = 0
+        i = min(count, len(self.values))
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find_kth(self, k):
+        """Smallest index whose prefix sum (inclusive) exceeds k, for non-negative values"""
+        pos = 0
+        step = 1
+        while step * 2 <= len(self.values):
+            step *= 2
+        while step > 0:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step //= 2
+        return pos
+
+
+class QueueIndex:
+    """Order-statistics index of a doctor's waiting queue.
+
+    Patients are kept in one band per priority level; within a band they are
+    ordered by arrival sequence, matching Doctor._sort_queue. Each band holds
+    two Fenwick trees over arrival sequence (patient counts and burst minutes),
+    so position lookups and cumulative waits are O(log n).
+    """
+    def __init__(self):
+        self.bands = {}      # priority sort key -> (count tree, burst tree)
+        self.band_counts = {}
+        self.band_bursts = {}
+        self.entries = {}    # patient_id -> (band key, arrival seq, burst)
+        self.next_seq = 0
+
+    @staticmethod
+    def band_key(priority):
+        return priority if isinstance(priority, int) else 999
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _band(self, key):
+        if key not in self.bands:
+            self.bands[key] = (FenwickTree(), FenwickTree())
+            self.band_counts[key] = 0
+            self.band_bursts[key] = 0
+        return self.bands[key]
+
+    def add(self, patient, seq=None):
+        """Index a newly queued patient (seq defaults to the next arrival slot)"""
+        if seq is None:
+            seq = self.next_seq
+        self.next_seq = max(self.next_seq, seq + 1)
+        key = self.band_key(patient.priority)
+        burst = patient.burst_time or 0
+        counts, bursts = self._band(key)
+        counts.add(seq, 1)
+        bursts.add(seq, burst)
+        self.band_counts[key] += 1
+        self.band_bursts[key] += burst
+        self.entries[patient.patient_id] = (key, seq, burst)
+
+    def remove(self, patient_id):
+        """Drop a patient; returns its arrival seq (or None if not indexed)"""
+        entry = self.entries.pop(patient_id, None)
+        if entry is None:
+            return None
+        key, seq, burst = entry
+        counts, bursts = self.bands[key]
+        counts.add(seq, -1)
+        bursts.add(seq, -burst)
+        self.band_counts[key] -= 1
+        self.band_bursts[key] -= burst
+        return seq
+
+    def update(self, patient):
+        """Re-index a patient whose priority or burst time changed, keeping arrival order"""
+        seq = self.remove(patient.patient_id)
+        self.add(patient, seq)
+
+    def clear(self):
+        self.__init__()
+
+    def position_of(self, patient_id):
+        """0-based queue position of a patient, or None"""
+        entry = self.entries.get(patient_id)
+        if entry is None:
+            return None
+        key, seq, _ = entry
+        before = sum(count for band, count in self.band_counts.items() if band < key)
+        return before + self.bands[key][0].prefix_sum(seq)
+
+    def burst_before(self, position):
+        """Total burst minutes of the patients ahead of the given 0-based position"""
+        position = max(0, min(position, len(self.entries)))
+        total = 0
+        for key in sorted(self.bands):
+            count = self.band_counts[key]
+            if position >= count:
+                position -= count
+                total += self.band_bursts[key]
+                continue
+            if position > 0:
+                counts, bursts = self.bands[key]
+                seq = counts.find_kth(position)
+                total += bursts.prefix_sum(seq)
+            break
+        return total
+
+    def insert_position(self, priority):
+        """Where a patient arriving now with this priority would be queued"""
+        key = self.band_key(priority)
+        position = sum(count for band, count in self.band_counts.items() if band <= key)
+        burst = sum(total for band, total in self.band_bursts.items() if band <= key)
+        return position, burst
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Replay captured API traffic (see HOSPITAL_OS_CAPTURE) against the app.
+
+    python replay.py capture.jsonl                     # 1x speed, in-process test client
+    python replay.py capture.jsonl --speed 10          # 10x faster than captured
+    python replay.py capture.jsonl --speed max         # as fast as possible
+    python replay.py capture.jsonl --target http://127.0.0.1:5000
+    python replay.py capture.jsonl --save-state a.json # then --compare-state a.json on a later run
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def load_capture(path):
+    with open(path, encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return sorted(entries, key=lambda e: e['ts'])
+
+
+class TestClientTarget:
+    """Replays through Flask's test client in this process"""
+    def __init__(self):
+        os.environ.pop('HOSPITAL_OS_CAPTURE', None)
+        import app as hospital_app
+        if hospital_app.scheduler is None and not hospital_app.initialize_system():
+            raise RuntimeError("Failed to initialize system")
+        self.client = hospital_app.app.test_client()
+
+    def send(self, method, url, body):
+        response = self.client.open(url, method=method, json=body)
+        payload = response.get_json(silent=True)
+        return response.status_code, payload
+
+
+class HttpTarget:
+    """Replays against a running server"""
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, method, url, body):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self.base_url + url, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'} if data else {})
+        try:
+            with urllib.request.urlopen(req) as response:
+                raw, status = response.read(), response.status
+        except urllib.error.HTTPError as e:
+            raw, status = e.read(), e.code
+        try:
+            return status, json.loads(raw)
+        except ValueError:
+            return status, None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def final_state(target):
+    """Summary of system state to diff between runs"""
+    _, schedule = target.send('GET', '/api/schedule', None)
+    _, resources = target.send('GET', '/api/resources/status', None)
+    state = {}
+    if schedule and schedule.get('success'):
+        state['overall_stats'] = schedule['overall_stats']
+        state['queues'] = {d['doctor_id']: [p['id'] for p in d['waiting_queue']] for d in schedule['doctors']}
+        state['in_treatment'] = {d['doctor_id']: d['current_patient']['id'] if d['current_patient'] else None
+                                 for d in schedule['doctors']}
+    if resources and resources.get('success'):
+        state['resources'] = {pool: sorted(info['occupied']) for pool, info in resources['data'].items()
+                              if isinstance(info, dict) and 'occupied' in info}
+    return state
+
+
+def diff_states(expected, actual, prefix=''):
+    diffs = []
+    for key in sorted(set(expected) | set(actual)):
+        a, b = expected.get(key), actual.get(key)
+        if isinstance(a, dict) and isinstance(b, dict):
+            diffs.extend(diff_states(a, b, f"{prefix}{key}."))
+        elif a != b:
+            diffs.append(f"{prefix}{key}: {a!r} -> {b!r}")
+    return diffs
+
+
+def replay(entries, target, speed=1.0):
+    """Send entries with their captured spacing divided by speed (None = no pacing)"""
+    latencies = []
+    mismatches = []
+    errors = 0
+    start = time.perf_counter()
+    first_ts = entries[0]['ts'] if entries else 0
+    for entry in entries:
+        if speed:
+            delay = (entry['ts'] - first_ts) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        url = entry['path'] + ('?' + entry['query'] if entry.get('query') else '')
+        sent = time.perf_counter()
+        try:
+            status, payload = target.send(entry['method'], url, entry.get('json'))
+        except Exception as e:
+            errors += 1
+            mismatches.append({'path': url, 'error': str(e)})
+            continue
+        latencies.append((time.perf_counter() - sent) * 1000)
+        success = payload.get('success') if isinstance(payload, dict) else None
+        if status != entry.get('status') or (entry.get('success') is not None and success != entry['success']):
+            mismatches.append({'path': url, 'captured': [entry.get('status'), entry.get('success')],
+                               'replayed': [status, success]})
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(entries),
+        'errors': errors,
+        'elapsed_seconds': round(elapsed, 3),
+        'captured_seconds': round(entries[-1]['ts'] - first_ts, 3) if entries else 0,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'max': round(latencies[-1], 3) if latencies else 0.0
+        },
+        'response_mismatches': mismatches
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay captured Hospital OS API traffic")
+    parser.add_argument('capture', help="JSONL file written by the capture middleware")
+    parser.add_argument('--speed', default='1', help="playback speed multiplier, or 'max'")
+    parser.add_argument('--target', default='test', help="'test' for the in-process test client, or a base URL")
+    parser.add_argument('--save-state', help="write the final state to this JSON file")
+    parser.add_argument('--compare-state', help="diff the final state against this JSON file")
+    args = parser.parse_args(argv)
+
+    speed = None if args.speed == 'max' else float(args.speed)
+    target = TestClientTarget() if args.target == 'test' else HttpTarget(args.target)
+    entries = load_capture(args.capture)
+
+    report = replay(entries, target, speed)
+    state = final_state(target)
+    report['final_state'] = state
+    if args.save_state:
+        with open(args.save_state, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+    if args.compare_state:
+        with open(args.compare_state, encoding='utf-8') as f:
+            report['state_diff'] = diff_states(json.load(f), state)
+
+    report['response_mismatch_count'] = len(report['response_mismatches'])
+    report['response_mismatches'] = report['response_mismatches'][:20]
+    print(json.dumps(report, indent=2))
+    return 0 if not report.get('state_diff') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
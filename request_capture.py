@@ -0,0 +1,78 @@
+"""Request Capture - buffered JSONL log of API traffic"""
+import json
+import queue
+import threading
+import time
+
+
+class RequestCapture:
+    """Queues request records on the request thread and writes them to JSONL from a background thread"""
+    def __init__(self, path, flush_interval=1.0, max_batch=512):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.written = 0
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._run, name="request-capture", daemon=True)
+        self._writer.start()
+
+    def record(self, entry):
+        """Non-blocking: called from the request thread"""
+        self.queue.put(entry)
+
+    def _drain(self, out):
+        batch = []
+        try:
+            while len(batch) < self.max_batch:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            for entry in batch:
+                entry['success'] = _success_flag(entry.pop('_response', None))
+            out.write(''.join(json.dumps(entry, separators=(',', ':'), default=str) + '\n' for entry in batch))
+            out.flush()
+            self.written += len(batch)
+        return len(batch)
+
+    def _run(self):
+        with open(self.path, 'a', encoding='utf-8') as out:
+            while not self._stop.is_set():
+                if self._drain(out) < self.max_batch:
+                    self._stop.wait(self.flush_interval)
+            while self._drain(out):
+                pass
+
+    def close(self):
+        self._stop.set()
+        self._writer.join()
+
+
+def _success_flag(body):
+    """'success' field of a JSON API response, found without parsing the body"""
+    if not body:
+        return None
+    if b'"success":true' in body or b'"success": true' in body:
+        return True
+    if b'"success":false' in body or b'"success": false' in body:
+        return False
+    return None
+
+
+def capture_entry(request, response, started):
+    """Record for one API request/response pair (the response body is inspected on the writer thread)"""
+    body = request.get_json(silent=True) if request.is_json else None
+    raw = None
+    if response.is_json and not response.direct_passthrough and response.headers.get('Content-Encoding') is None:
+        raw = response.get_data()
+    return {
+        'ts': started,
+        'method': request.method,
+        'path': request.path,
+        'query': request.query_string.decode('utf-8', 'replace'),
+        'json': body,
+        'status': response.status_code,
+        'duration_ms': round((time.time() - started) * 1000, 3),
+        '_response': raw
+    }
@@ -0,0 +1,336 @@
+"""Reservation Calendar - time-slotted bookings per resource"""
+import heapq
+import itertools
+import random
+from datetime import datetime
+
+INFINITY = float('inf')
+
+
+class Reservation:
+    def __init__(self, reservation_id, resource_id, patient_id, doctor_id, start, end, notes="", hold_expires=None):
+        self.reservation_id = reservation_id
+        self.resource_id = resource_id
+        self.patient_id = patient_id
+        self.doctor_id = doctor_id
+        self.start = start
+        self.end = end
+        self.notes = notes
+        # Holds are tentative and released unless confirmed before hold_expires
+        self.hold_expires = hold_expires
+        self.status = 'HELD' if hold_expires is not None else 'CONFIRMED'
+
+    def to_dict(self):
+        return {
+            'reservation_id': self.reservation_id,
+            'resource_id': self.resource_id,
+            'patient_id': self.patient_id,
+            'doctor_id': self.doctor_id,
+            'start': datetime.fromtimestamp(self.start).isoformat(),
+            'end': datetime.fromtimestamp(self.end).isoformat(),
+            'duration_minutes': round((self.end - self.start) / 60, 1),
+            'status': self.status,
+            'hold_expires': datetime.fromtimestamp(self.hold_expires).isoformat() if self.hold_expires else None,
+            'notes': self.notes
+        }
+
+
+class _Node:
+    __slots__ = ('start', 'end', 'reservation', 'prio', 'left', 'right', 'gap', 'max_gap')
+
+    def __init__(self, reservation):
+        self.start = reservation.start
+        self.end = reservation.end
+        self.reservation = reservation
+        self.prio = random.random()
+        self.left = None
+        self.right = None
+        self.gap = INFINITY       # free time between this booking and the next one
+        self.max_gap = INFINITY   # largest gap in this subtree
+
+
+def _pull(node):
+    node.max_gap = node.gap
+    if node.left is not None and node.left.max_gap > node.max_gap:
+        node.max_gap = node.left.max_gap
+    if node.right is not None and node.right.max_gap > node.max_gap:
+        node.max_gap = node.right.max_gap
+
+
+def _split(node, key, inclusive=False):
+    """Split into (start < key, start >= key); with inclusive, (start <= key, start > key)"""
+    if node is None:
+        return None, None
+    if node.start < key or (inclusive and node.start == key):
+        left, right = _split(node.right, key, inclusive)
+        node.right = left
+        _pull(node)
+        return node, right
+    left, right = _split(node.left, key, inclusive)
+    node.left = right
+    _pull(node)
+    return left, node
+
+
+def _merge(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.prio > right.prio:
+        left.right = _merge(left.right, right)
+        _pull(left)
+        return left
+    right.left = _merge(left, right.left)
+    _pull(right)
+    return right
+
+
+def _leftmost(node):
+    while node is not None and node.left is not None:
+        node = node.left
+    return node
+
+
+def _set_rightmost_gap(node, gap):
+    if node is None:
+        return
+    if node.right is None:
+        node.gap = gap
+    else:
+        _set_rightmost_gap(node.right, gap)
+    _pull(node)
+
+
+class ResourceCalendar:
+    """Non-overlapping bookings of one resource in a treap keyed by start time.
+
+    Every node also stores the free gap until the next booking and the
+    largest gap in its subtree, so book, cancel, conflict checks and
+    earliest-free-slot queries are all O(log n).
+    """
+    def __init__(self, resource_id):
+        self.resource_id = resource_id
+        self.root = None
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _last_before(self, ts):
+        """Booking with the largest start < ts"""
+        node, best = self.root, None
+        while node is not None:
+            if node.start < ts:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
+
+    def conflicts(self, start, end):
+        """First booking overlapping [start, end), or None"""
+        node = self._last_before(end)
+        if node is not None and node.end > start:
+            return node.reservation
+        return None
+
+    def booking_at(self, ts):
+        node = self._last_before(ts + 1e-6)
+        if node is not None and node.end > ts:
+            return node.reservation
+        return None
+
+    def insert(self, reservation):
+        left, right = _split(self.root, reservation.start)
+        node = _Node(reservation)
+        successor = _leftmost(right)
+        node.gap = successor.start - node.end if successor is not None else INFINITY
+        _pull(node)
+        _set_rightmost_gap(left, node.start - _rightmost_end(left) if left is not None else INFINITY)
+        self.root = _merge(_merge(left, node), right)
+        self.count += 1
+
+    def remove(self, reservation):
+        left, rest = _split(self.root, reservation.start)
+        middle, right = _split(rest, reservation.start, inclusive=True)
+        if middle is None:
+            self.root = _merge(left, right)
+            return False
+        successor = _leftmost(right)
+        if left is not None:
+            _set_rightmost_gap(left, successor.start - _rightmost_end(left) if successor is not None else INFINITY)
+        self.root = _merge(left, right)
+        self.count -= 1
+        return True
+
+    def earliest_slot(self, after, duration):
+        """Earliest start >= after at which [start, start + duration) is free"""
+        blocking = self._last_before(after + duration)
+        if blocking is None or blocking.end <= after:
+            return after
+        node = self._first_fit(self.root, after, duration)
+        return node.end
+
+    def _first_fit(self, node, after, duration):
+        """First booking (in time order) ending at/after 'after' followed by a gap >= duration"""
+        if node is None or node.max_gap < duration:
+            return None
+        if node.end >= after:
+            found = self._first_fit(node.left, after, duration)
+            if found is not None:
+                return found
+            if node.gap >= duration:
+                return node
+        return self._first_fit(node.right, after, duration)
+
+    def first(self):
+        node = _leftmost(self.root)
+        return node.reservation if node is not None else None
+
+    def reservations(self, start=None, end=None):
+        """Bookings overlapping [start, end) in time order"""
+        result = []
+        self._collect(self.root, start, end, result)
+        return result
+
+    def _collect(self, node, start, end, result):
+        if node is None:
+            return
+        if start is None or node.end > start:
+            self._collect(node.left, start, end, result)
+        if (start is None or node.end > start) and (end is None or node.start < end):
+            result.append(node.reservation)
+        if end is None or node.start < end:
+            self._collect(node.right, start, end, result)
+
+
+def _rightmost_end(node):
+    while node.right is not None:
+        node = node.right
+    return node.end
+
+
+class ReservationCalendar:
+    """Booking calendars for a pool of resources, with expiring holds"""
+    def __init__(self, resource_ids, prefix="RSV"):
+        self.calendars = {rid: ResourceCalendar(rid) for rid in resource_ids}
+        self.reservations = {}
+        self.hold_heap = []  # (hold_expires, reservation_id)
+        self.occupied = {}   # resource_id -> allocated until (lease end, INFINITY without a lease)
+        self.prefix = prefix
+        self._ids = itertools.count(1)
+
+    def book(self, patient_id, doctor_id, duration_minutes, start=None, resource_id=None, notes="", hold_minutes=None, now=None):
+        """Book a resource; with no start, takes the earliest free slot.
+
+        Returns (success, message, reservation)."""
+        now = now if now is not None else datetime.now().timestamp()
+        self.release_expired(now)
+        duration = float(duration_minutes) * 60
+        if duration <= 0:
+            return False, "Duration must be positive", None
+        if resource_id is not None and resource_id not in self.calendars:
+            return False, f"Resource {resource_id} not found", None
+
+        if start is None:
+            slot = self.find_earliest_slot(duration_minutes, now, resource_id, now=now)
+            if slot is None:
+                return False, "All resources are in use with no lease end; no slot can be offered yet", None
+            resource_id, start = slot
+        elif start < now:
+            return False, "Cannot book a slot in the past", None
+        elif resource_id is None:
+            free = [rid for rid, cal in self.calendars.items()
+                    if start >= self.occupied.get(rid, start) and cal.conflicts(start, start + duration) is None]
+            if not free:
+                return False, "No resource free for the requested slot", None
+            resource_id = free[0]
+        else:
+            if start < self.occupied.get(resource_id, start):
+                return False, f"{resource_id} is in use at the requested time", None
+            clash = self.calendars[resource_id].conflicts(start, start + duration)
+            if clash is not None:
+                return False, f"{resource_id} is already booked by {clash.reservation_id}", None
+
+        hold_expires = now + float(hold_minutes) * 60 if hold_minutes else None
+        reservation = Reservation(f"{self.prefix}-{next(self._ids):06d}", resource_id, patient_id, doctor_id,
+                                  start, start + duration, notes, hold_expires)
+        self.calendars[resource_id].insert(reservation)
+        self.reservations[reservation.reservation_id] = reservation
+        if hold_expires is not None:
+            heapq.heappush(self.hold_heap, (hold_expires, reservation.reservation_id))
+        return True, f"{resource_id} booked for {patient_id}", reservation
+
+    def cancel(self, reservation_id):
+        reservation = self.reservations.pop(reservation_id, None)
+        if reservation is None:
+            return False, f"Reservation {reservation_id} not found", None
+        self.calendars[reservation.resource_id].remove(reservation)
+        reservation.status = 'CANCELLED'
+        return True, f"Reservation {reservation_id} cancelled", reservation
+
+    def confirm(self, reservation_id, now=None):
+        self.release_expired(now)
+        reservation = self.reservations.get(reservation_id)
+        if reservation is None:
+            return False, f"Reservation {reservation_id} not found", None
+        reservation.hold_expires = None
+        reservation.status = 'CONFIRMED'
+        return True, f"Reservation {reservation_id} confirmed", reservation
+
+    def occupy(self, resource_id, until=None):
+        """Mark a resource as allocated now, until its lease ends (indefinitely without one)"""
+        self.occupied[resource_id] = until if until is not None else INFINITY
+
+    def vacate(self, resource_id):
+        self.occupied.pop(resource_id, None)
+
+    def find_earliest_slot(self, duration_minutes, after=None, resource_id=None, now=None):
+        """(resource_id, start timestamp) of the earliest free slot of this length.
+
+        Allocated resources are free from their lease end; None if every
+        candidate is allocated with no lease."""
+        now = now if now is not None else datetime.now().timestamp()
+        self.release_expired(now)
+        after = max(after if after is not None else now, now)
+        duration = float(duration_minutes) * 60
+        candidates = [self.calendars[resource_id]] if resource_id is not None else self.calendars.values()
+        best = None
+        for calendar in candidates:
+            free_from = max(after, self.occupied.get(calendar.resource_id, after))
+            if free_from == INFINITY:
+                continue
+            start = calendar.earliest_slot(free_from, duration)
+            if best is None or start < best[1]:
+                best = (calendar.resource_id, start)
+        return best
+
+    def booking_at(self, resource_id, ts):
+        return self.calendars[resource_id].booking_at(ts)
+
+    def release_expired(self, now=None):
+        """Drop unconfirmed holds past their expiry and bookings that have ended"""
+        now = now if now is not None else datetime.now().timestamp()
+        released = []
+        while self.hold_heap and self.hold_heap[0][0] <= now:
+            _, reservation_id = heapq.heappop(self.hold_heap)
+            reservation = self.reservations.get(reservation_id)
+            if reservation is not None and reservation.status == 'HELD' and reservation.hold_expires <= now:
+                self.cancel(reservation_id)
+                reservation.status = 'EXPIRED'
+                released.append(reservation)
+        for calendar in self.calendars.values():
+            first = calendar.first()
+            while first is not None and first.end <= now:
+                calendar.remove(first)
+                self.reservations.pop(first.reservation_id, None)
+                first = calendar.first()
+        return released
+
+    def list_reservations(self, resource_id=None, start=None, end=None):
+        calendars = [self.calendars[resource_id]] if resource_id is not None else self.calendars.values()
+        result = []
+        for calendar in calendars:
+            result.extend(calendar.reservations(start, end))
+        return sorted(result, key=lambda r: (r.start, r.resource_id))
@@ -1,7 +1,14 @@
 """Resource Manager with Fixed Deallocation"""
+import heapq
+import itertools
+import math
 import threading
+import time
+from contextlib import ExitStack
 from datetime import datetime
 from enum import Enum
+from process_sync import InstrumentedLock, PriorityWaitQueue
+from reservation_calendar import INFINITY, ReservationCalendar
 
 class ResourceType(Enum):
     BED = "BED"
@@ -17,8 +24,34 @@ class Resource:
         self.assigned_to = None
         self.assigned_doctor = None
         self.allocation_time = None
+        self.lease_expires = None
         self.notes = ""
 
+POOL_KEYS = {
+    ResourceType.BED: 'beds',
+    ResourceType.OPERATION_ROOM: 'operation_rooms',
+    ResourceType.VENTILATOR: 'ventilators',
+    ResourceType.MONITOR: 'monitors'
+}
+
+RESOURCE_LABELS = {'beds': 'bed', 'operation_rooms': 'operation_room', 'ventilators': 'ventilator', 'monitors': 'monitor'}
+
+RESOURCE_NAMES = {'beds': 'Bed', 'operation_rooms': 'Operation Room', 'ventilators': 'Ventilator', 'monitors': 'Monitor'}
+
+def parse_lease_minutes(lease_minutes):
+    """(minutes or None, error message) for a lease length from a request"""
+    if lease_minutes is None or lease_minutes == '':
+        return None, None
+    if isinstance(lease_minutes, bool):
+        return None, "lease_minutes must be a number"
+    try:
+        minutes = float(lease_minutes)
+    except (TypeError, ValueError):
+        return None, "lease_minutes must be a number"
+    if not math.isfinite(minutes) or minutes <= 0:
+        return None, "lease_minutes must be a positive number"
+    return minutes, None
+
 class ResourceManager:
     def __init__(self, num_beds=10, num_operation_rooms=3, num_ventilators=5, num_monitors=10):
         self.num_beds = num_beds
@@ -32,36 +65,136 @@ class ResourceManager:
         self.ventilators = {f"VENT-{i:03d}": Resource(f"VENT-{i:03d}", ResourceType.VENTILATOR) for i in range(1, num_ventilators + 1)}
         self.monitors = {f"MON-{i:03d}": Resource(f"MON-{i:03d}", ResourceType.MONITOR) for i in range(1, num_monitors + 1)}
 
-        self.bed_lock = threading.RLock()
-        self.or_lock = threading.RLock()
-        self.vent_lock = threading.RLock()
-        self.mon_lock = threading.RLock()
+        self.bed_lock = InstrumentedLock("resources.bed")
+        self.or_lock = InstrumentedLock("resources.or")
+        self.vent_lock = InstrumentedLock("resources.ventilator")
+        self.mon_lock = InstrumentedLock("resources.monitor")
+
+        # Pool key -> (resources, lock); bulk operations lock pools in this order
+        self.pools = {
+            'beds': (self.beds, self.bed_lock),
+            'operation_rooms': (self.operation_rooms, self.or_lock),
+            'ventilators': (self.ventilators, self.vent_lock),
+            'monitors': (self.monitors, self.mon_lock)
+        }
+
+        self.or_calendar = ReservationCalendar(self.operation_rooms.keys(), prefix="ORB")
+        # Blocking allocation; ORs are scheduled through or_calendar instead
+        self.wait_queues = {pool: PriorityWaitQueue(pool) for pool in ('beds', 'ventilators', 'monitors')}
 
         self.allocation_history = []
         self.event = threading.Event()
-
-    def allocate_bed(self, patient_id, doctor_id, notes=""):
+        # Bumped under each pool's lock on every state change (status cache key)
+        self.pool_versions = {'beds': 0, 'operation_rooms': 0, 'ventilators': 0, 'monitors': 0}
+
+        # Guards the patient index, lease heap and reclaim counters (always taken after a pool lock)
+        self.registry_lock = threading.Lock()
+        self.patient_allocations = {}  # patient_id -> set of resource ids
+        self.lease_heap = []           # (lease_expires, seq, pool key, resource_id)
+        self._lease_seq = itertools.count()
+        self.reclaimed = {}            # release reason -> {'count', 'held_minutes'}
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+        self._lease_wakeup = threading.Event()
+
+    def get_state_version(self):
+        """Tuple that changes whenever any pool changes"""
+        versions = self.pool_versions
+        return (versions['beds'], versions['operation_rooms'], versions['ventilators'], versions['monitors'])
+
+    def _assign(self, resource, patient_id, doctor_id, notes="", lease_minutes=None):
+        """Mark resource allocated (caller holds the pool lock)"""
+        pool = POOL_KEYS[resource.resource_type]
+        resource.available = False
+        resource.assigned_to = patient_id
+        resource.assigned_doctor = doctor_id
+        resource.allocation_time = datetime.now()
+        resource.notes = notes
+        resource.lease_expires = None
+
+        self.allocation_history.append({
+            'resource': resource.resource_id,
+            'patient': patient_id,
+            'doctor': doctor_id,
+            'timestamp': resource.allocation_time.isoformat(),
+            'action': 'ALLOCATED'
+        })
+
+        with self.registry_lock:
+            self.patient_allocations.setdefault(patient_id, set()).add(resource.resource_id)
+        if lease_minutes:
+            self._set_lease(resource, pool, lease_minutes)
+        elif pool == 'operation_rooms':
+            self.or_calendar.occupy(resource.resource_id)
+
+        self.pool_versions[pool] += 1
+        self.event.set()
+        self.event.clear()
+
+    def _release(self, resource, doctor_id, action='DEALLOCATED'):
+        """Mark resource free and return the patient it was held by (caller holds the pool lock)"""
+        pool = POOL_KEYS[resource.resource_type]
+        patient_id = resource.assigned_to
+        now = datetime.now()
+        held_minutes = (now - resource.allocation_time).total_seconds() / 60 if resource.allocation_time else 0
+        resource.available = True
+        resource.assigned_to = None
+        resource.assigned_doctor = None
+        resource.lease_expires = None
+        if pool == 'operation_rooms':
+            self.or_calendar.vacate(resource.resource_id)
+
+        self.allocation_history.append({
+            'resource': resource.resource_id,
+            'patient': patient_id,
+            'doctor': doctor_id,
+            'timestamp': now.isoformat(),
+            'action': action
+        })
+
+        with self.registry_lock:
+            allocated = self.patient_allocations.get(patient_id)
+            if allocated is not None:
+                allocated.discard(resource.resource_id)
+                if not allocated:
+                    del self.patient_allocations[patient_id]
+            if action != 'DEALLOCATED':
+                stats = self.reclaimed.setdefault(action, {'count': 0, 'held_minutes': 0.0})
+                stats['count'] += 1
+                stats['held_minutes'] += held_minutes
+
+        self.pool_versions[pool] += 1
+        self.event.set()
+        self.event.clear()
+
+        # Hand the freed resource straight to the most critical waiter
+        queue = self.wait_queues.get(pool)
+        if queue is not None:
+            waiter = queue.pop_next()
+            if waiter is not None:
+                self._assign(resource, waiter.patient_id, waiter.doctor_id, waiter.notes, waiter.lease_minutes)
+                waiter.grant(resource.resource_id)
+        return patient_id
+
+    def _set_lease(self, resource, pool, lease_minutes):
+        expires = datetime.now().timestamp() + lease_minutes * 60
+        resource.lease_expires = expires
+        if pool == 'operation_rooms':
+            # Future bookings for this room start no earlier than the lease end
+            self.or_calendar.occupy(resource.resource_id, expires)
+        with self.registry_lock:
+            heapq.heappush(self.lease_heap, (expires, next(self._lease_seq), pool, resource.resource_id))
+        self._lease_wakeup.set()
+
+    def allocate_bed(self, patient_id, doctor_id, notes="", lease_minutes=None):
         """Allocate bed with synchronization"""
+        lease_minutes, error = parse_lease_minutes(lease_minutes)
+        if error:
+            return False, error, None
         with self.bed_lock:
             for bed_id, bed in self.beds.items():
                 if bed.available:
-                    bed.available = False
-                    bed.assigned_to = patient_id
-                    bed.assigned_doctor = doctor_id
-                    bed.allocation_time = datetime.now()
-                    bed.notes = notes
-
-                    self.allocation_history.append({
-                        'resource': bed.resource_id,
-                        'patient': patient_id,
-                        'doctor': doctor_id,
-                        'timestamp': bed.allocation_time.isoformat(),
-                        'action': 'ALLOCATED'
-                    })
-
-                    self.event.set()
-                    self.event.clear()
-
+                    self._assign(bed, patient_id, doctor_id, notes, lease_minutes)
                     return True, f"Bed {bed.resource_id} allocated to {patient_id}", bed.resource_id
 
             return False, "No beds available", None
@@ -73,22 +206,7 @@ class ResourceManager:
             if bed_id in self.beds:
                 bed = self.beds[bed_id]
                 if not bed.available:
-                    patient_id = bed.assigned_to
-                    bed.available = True
-                    bed.assigned_to = None
-                    bed.assigned_doctor = None
-
-                    self.allocation_history.append({
-                        'resource': bed.resource_id,
-                        'patient': patient_id,
-                        'doctor': doctor_id,
-                        'timestamp': datetime.now().isoformat(),
-                        'action': 'DEALLOCATED'
-                    })
-
-                    self.event.set()
-                    self.event.clear()
-
+                    patient_id = self._release(bed, doctor_id)
                     return True, f"Bed {bed.resource_id} deallocated", patient_id
                 else:
                     return False, f"Bed {bed_id} is not allocated", None
@@ -96,29 +214,30 @@ class ResourceManager:
                 # Return more helpful error message
                 return False, f"Bed {bed_id} not found. Available beds: {', '.join(self.beds.keys())}", None
 
-    def allocate_operation_room(self, patient_id, doctor_id, notes=""):
+    def allocate_operation_room(self, patient_id, doctor_id, notes="", lease_minutes=None):
         """Allocate operation room with synchronization"""
+        lease_minutes, error = parse_lease_minutes(lease_minutes)
+        if error:
+            return False, error, None
         with self.or_lock:
+            now = datetime.now().timestamp()
+            self.or_calendar.release_expired(now)
+            # Without a lease the room is held indefinitely, so every later booking counts
+            end = now + lease_minutes * 60 if lease_minutes else INFINITY
+            candidates = []
             for or_id, or_room in self.operation_rooms.items():
-                if or_room.available:
-                    or_room.available = False
-                    or_room.assigned_to = patient_id
-                    or_room.assigned_doctor = doctor_id
-                    or_room.allocation_time = datetime.now()
-                    or_room.notes = notes
-
-                    self.allocation_history.append({
-                        'resource': or_room.resource_id,
-                        'patient': patient_id,
-                        'doctor': doctor_id,
-                        'timestamp': or_room.allocation_time.isoformat(),
-                        'action': 'ALLOCATED'
-                    })
-
-                    self.event.set()
-                    self.event.clear()
-
-                    return True, f"Operation Room {or_room.resource_id} allocated", or_room.resource_id
+                if not or_room.available:
+                    continue
+                calendar = self.or_calendar.calendars[or_id]
+                if any(r.patient_id != patient_id for r in calendar.reservations(now, end)):
+                    continue
+                # This patient's current booking first, then rooms with nothing booked ahead
+                own = self.or_calendar.booking_at(or_id, now)
+                rank = 0 if own is not None and own.patient_id == patient_id else (1 if not calendar.reservations(now) else 2)
+                candidates.append((rank, or_id, or_room))
+            for _, or_id, or_room in sorted(candidates, key=lambda c: c[0]):
+                self._assign(or_room, patient_id, doctor_id, notes, lease_minutes)
+                return True, f"Operation Room {or_room.resource_id} allocated", or_room.resource_id
 
             return False, "No operation rooms available", None
 
@@ -128,41 +247,47 @@ class ResourceManager:
             if or_id in self.operation_rooms:
                 or_room = self.operation_rooms[or_id]
                 if not or_room.available:
-                    patient_id = or_room.assigned_to
-                    or_room.available = True
-                    or_room.assigned_to = None
-                    or_room.assigned_doctor = None
-
-                    self.allocation_history.append({
-                        'resource': or_room.resource_id,
-                        'patient': patient_id,
-                        'doctor': doctor_id,
-                        'timestamp': datetime.now().isoformat(),
-                        'action': 'DEALLOCATED'
-                    })
-
-                    self.event.set()
-                    self.event.clear()
-
+                    patient_id = self._release(or_room, doctor_id)
                     return True, f"Operation Room {or_room.resource_id} deallocated", patient_id
                 else:
                     return False, f"Operation Room {or_id} is not allocated", None
             else:
                 return False, f"Operation Room {or_id} not found", None
 
-    def allocate_ventilator(self, patient_id, doctor_id):
+    def book_operation_room(self, patient_id, doctor_id, duration_minutes, start=None, or_id=None, notes="", hold_minutes=None):
+        """Book an OR for a future slot (earliest free slot when start is None)"""
+        with self.or_lock:
+            return self.or_calendar.book(patient_id, doctor_id, duration_minutes, start=start, resource_id=or_id,
+                                         notes=notes, hold_minutes=hold_minutes)
+
+    def cancel_operation_room_booking(self, reservation_id):
+        with self.or_lock:
+            return self.or_calendar.cancel(reservation_id)
+
+    def confirm_operation_room_booking(self, reservation_id):
+        """Turn a tentative hold into a confirmed booking"""
+        with self.or_lock:
+            return self.or_calendar.confirm(reservation_id)
+
+    def find_operation_room_slot(self, duration_minutes, after=None, or_id=None):
+        """Earliest (or_id, start timestamp) free for duration_minutes"""
+        with self.or_lock:
+            return self.or_calendar.find_earliest_slot(duration_minutes, after, or_id)
+
+    def get_operation_room_bookings(self, or_id=None, start=None, end=None):
+        with self.or_lock:
+            self.or_calendar.release_expired()
+            return [r.to_dict() for r in self.or_calendar.list_reservations(or_id, start, end)]
+
+    def allocate_ventilator(self, patient_id, doctor_id, lease_minutes=None):
         """Allocate ventilator with synchronization"""
+        lease_minutes, error = parse_lease_minutes(lease_minutes)
+        if error:
+            return False, error, None
         with self.vent_lock:
             for vent_id, vent in self.ventilators.items():
                 if vent.available:
-                    vent.available = False
-                    vent.assigned_to = patient_id
-                    vent.assigned_doctor = doctor_id
-                    vent.allocation_time = datetime.now()
-
-                    self.event.set()
-                    self.event.clear()
-
+                    self._assign(vent, patient_id, doctor_id, lease_minutes=lease_minutes)
                     return True, f"Ventilator {vent.resource_id} allocated", vent.resource_id
 
             return False, "No ventilators available", None
@@ -173,32 +298,22 @@ class ResourceManager:
             if vent_id in self.ventilators:
                 vent = self.ventilators[vent_id]
                 if not vent.available:
-                    patient_id = vent.assigned_to
-                    vent.available = True
-                    vent.assigned_to = None
-
-                    self.event.set()
-                    self.event.clear()
-
+                    patient_id = self._release(vent, doctor_id)
                     return True, f"Ventilator {vent.resource_id} deallocated", patient_id
                 else:
                     return False, f"Ventilator {vent_id} is not allocated", None
             else:
                 return False, f"Ventilator {vent_id} not found", None
 
-    def allocate_monitor(self, patient_id, doctor_id):
+    def allocate_monitor(self, patient_id, doctor_id, lease_minutes=None):
         """Allocate monitor with synchronization"""
+        lease_minutes, error = parse_lease_minutes(lease_minutes)
+        if error:
+            return False, error, None
         with self.mon_lock:
             for mon_id, mon in self.monitors.items():
                 if mon.available:
-                    mon.available = False
-                    mon.assigned_to = patient_id
-                    mon.assigned_doctor = doctor_id
-                    mon.allocation_time = datetime.now()
-
-                    self.event.set()
-                    self.event.clear()
-
+                    self._assign(mon, patient_id, doctor_id, lease_minutes=lease_minutes)
                     return True, f"Monitor {mon.resource_id} allocated", mon.resource_id
 
             return False, "No monitors available", None
@@ -209,19 +324,197 @@ class ResourceManager:
             if mon_id in self.monitors:
                 mon = self.monitors[mon_id]
                 if not mon.available:
-                    patient_id = mon.assigned_to
-                    mon.available = True
-                    mon.assigned_to = None
-
-                    self.event.set()
-                    self.event.clear()
-
+                    patient_id = self._release(mon, doctor_id)
                     return True, f"Monitor {mon.resource_id} deallocated", patient_id
                 else:
                     return False, f"Monitor {mon_id} is not allocated", None
             else:
                 return False, f"Monitor {mon_id} not found", None
 
+    def allocate_waiting(self, pool, patient_id, doctor_id, priority=3, timeout=30.0, notes="", lease_minutes=None):
+        """Allocate from a pool, blocking up to timeout seconds in its priority wait queue"""
+        lease_minutes, error = parse_lease_minutes(lease_minutes)
+        if error:
+            return False, error, None
+        if pool not in self.wait_queues:
+            return False, f"Waiting is not supported for {pool}", None
+        allocate = {
+            'beds': lambda: self.allocate_bed(patient_id, doctor_id, notes, lease_minutes),
+            'ventilators': lambda: self.allocate_ventilator(patient_id, doctor_id, lease_minutes),
+            'monitors': lambda: self.allocate_monitor(patient_id, doctor_id, lease_minutes)
+        }[pool]
+        _, lock = self.pools[pool]
+        queue = self.wait_queues[pool]
+
+        with lock:
+            success, msg, resource_id = allocate()
+            if success or not timeout or timeout <= 0:
+                return success, msg, resource_id
+            waiter = queue.enqueue(patient_id, doctor_id, priority, notes, lease_minutes)
+
+        waiter.wait(timeout)
+
+        with lock:
+            if waiter.resource_id is not None:
+                waited = time.time() - waiter.enqueued_at
+                return True, f"{RESOURCE_NAMES[pool]} {waiter.resource_id} allocated after waiting {waited:.1f}s", waiter.resource_id
+            if waiter.cancelled:
+                return False, f"Wait for {RESOURCE_LABELS[pool]} cancelled", None
+            queue.cancel(waiter)
+            return False, f"No {RESOURCE_LABELS[pool]} freed within {timeout:g}s", None
+
+    def get_wait_queues(self):
+        """Current waiters per pool, in hand-off order"""
+        result = {}
+        for pool, queue in self.wait_queues.items():
+            with self.pools[pool][1]:
+                result[pool] = queue.snapshot()
+        return result
+
+    def _find_pool(self, resource_id):
+        for pool, (resources, _) in self.pools.items():
+            if resource_id in resources:
+                return pool
+        return None
+
+    def renew_lease(self, resource_id, lease_minutes):
+        """Extend (or start) the lease on an allocated resource"""
+        lease_minutes, error = parse_lease_minutes(lease_minutes)
+        if error or lease_minutes is None:
+            return False, error or "lease_minutes is required", None
+        pool = self._find_pool(resource_id)
+        if pool is None:
+            return False, f"Resource {resource_id} not found", None
+        resources, lock = self.pools[pool]
+        with lock:
+            resource = resources[resource_id]
+            if resource.available:
+                return False, f"Resource {resource_id} is not allocated", None
+            if pool == 'operation_rooms':
+                now = datetime.now().timestamp()
+                for reservation in self.or_calendar.calendars[resource_id].reservations(now, now + lease_minutes * 60):
+                    if reservation.patient_id != resource.assigned_to:
+                        return False, f"{resource_id} is booked by {reservation.reservation_id} before the lease would end", None
+            self._set_lease(resource, pool, lease_minutes)
+            return True, f"Lease on {resource_id} renewed", datetime.fromtimestamp(resource.lease_expires).isoformat()
+
+    def release_expired_leases(self, now=None):
+        """Release every allocation whose lease deadline has passed; returns released ids"""
+        now = now if now is not None else datetime.now().timestamp()
+        due = []
+        with self.registry_lock:
+            while self.lease_heap and self.lease_heap[0][0] <= now:
+                expires, _, pool, resource_id = heapq.heappop(self.lease_heap)
+                due.append((expires, pool, resource_id))
+
+        released = []
+        for expires, pool, resource_id in due:
+            resources, lock = self.pools[pool]
+            with lock:
+                resource = resources[resource_id]
+                # Skip stale heap entries (lease renewed, or resource released/reallocated since)
+                if not resource.available and resource.lease_expires == expires:
+                    self._release(resource, None, action='LEASE_EXPIRED')
+                    released.append(resource_id)
+        return released
+
+    def release_patient_resources(self, patient_id, doctor_id=None, action='DISCHARGED'):
+        """Release everything held by a patient in one operation; returns released ids"""
+        # A discharged patient must not be handed a resource later
+        for pool, queue in self.wait_queues.items():
+            with self.pools[pool][1]:
+                queue.cancel_patient(patient_id)
+
+        with self.registry_lock:
+            held = set(self.patient_allocations.get(patient_id, ()))
+        if not held:
+            return []
+
+        released = []
+        with ExitStack() as stack:
+            targets = []
+            for pool, (resources, lock) in self.pools.items():
+                ids = [rid for rid in resources if rid in held]
+                if ids:
+                    stack.enter_context(lock)
+                    targets.extend(resources[rid] for rid in ids)
+            for resource in targets:
+                if not resource.available and resource.assigned_to == patient_id:
+                    self._release(resource, doctor_id, action=action)
+                    released.append(resource.resource_id)
+        return released
+
+    def release_all(self, action='RESET'):
+        """Release every allocated resource (e.g. on system reset)"""
+        released = []
+        with ExitStack() as stack:
+            for resources, lock in self.pools.values():
+                stack.enter_context(lock)
+            for queue in self.wait_queues.values():
+                queue.cancel_all()
+            for resources, _ in self.pools.values():
+                for resource in resources.values():
+                    if not resource.available:
+                        self._release(resource, None, action=action)
+                        released.append(resource.resource_id)
+        return released
+
+    def start_lease_reaper(self, interval=5.0):
+        """Background thread releasing expired leases as their deadlines come up"""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._reaper_stop.clear()
+        self._reaper = threading.Thread(target=self._reaper_loop, args=(interval,), name="lease-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_lease_reaper(self):
+        self._reaper_stop.set()
+        self._lease_wakeup.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+
+    def _reaper_loop(self, interval):
+        while not self._reaper_stop.is_set():
+            self.release_expired_leases()
+            with self.registry_lock:
+                next_deadline = self.lease_heap[0][0] if self.lease_heap else None
+            timeout = interval
+            if next_deadline is not None:
+                timeout = min(interval, max(0.0, next_deadline - datetime.now().timestamp()))
+            self._lease_wakeup.wait(timeout)
+            self._lease_wakeup.clear()
+
+    def get_utilization(self):
+        """Per-pool utilization plus capacity reclaimed by automatic release"""
+        pools = {}
+        for pool, (resources, lock) in self.pools.items():
+            with lock:
+                in_use = sum(1 for r in resources.values() if not r.available)
+                leased = sum(1 for r in resources.values() if not r.available and r.lease_expires is not None)
+                waiting = len(self.wait_queues[pool]) if pool in self.wait_queues else 0
+            total = len(resources)
+            pools[pool] = {
+                'total': total,
+                'in_use': in_use,
+                'leased': leased,
+                'waiting': waiting,
+                'utilization_pct': round(100.0 * in_use / total, 1) if total else 0.0
+            }
+
+        with self.registry_lock:
+            reclaimed = {action: {'count': stats['count'], 'held_minutes': round(stats['held_minutes'], 1)}
+                         for action, stats in self.reclaimed.items()}
+            pending_leases = len(self.lease_heap)
+
+        return {
+            'pools': pools,
+            'reclaimed': reclaimed,
+            'reclaimed_total': sum(stats['count'] for stats in reclaimed.values()),
+            'pending_leases': pending_leases,
+            'timestamp': datetime.now().isoformat()
+        }
+
     def get_status(self):
         """Get all resources status"""
         with self.bed_lock:
@@ -254,23 +547,12 @@ class ResourceManager:
 
     def get_patient_resources(self, patient_id):
         """Get all resources allocated to a patient"""
-        resources = {}
+        with self.registry_lock:
+            held = sorted(self.patient_allocations.get(patient_id, ()))
 
-        for bed_id, bed in self.beds.items():
-            if bed.assigned_to == patient_id:
-                resources['bed'] = bed.resource_id
-
-        for or_id, or_room in self.operation_rooms.items():
-            if or_room.assigned_to == patient_id:
-                resources['operation_room'] = or_room.resource_id
-
-        for vent_id, vent in self.ventilators.items():
-            if vent.assigned_to == patient_id:
-                resources['ventilator'] = vent.resource_id
-
-        for mon_id, mon in self.monitors.items():
-            if mon.assigned_to == patient_id:
-                resources['monitor'] = mon.resource_id
+        resources = {}
+        for resource_id in held:
+            resources[RESOURCE_LABELS[self._find_pool(resource_id)]] = resource_id
 
         return resources
 
@@ -0,0 +1,107 @@
+"""Pre-encoded JSON Response Cache"""
+import gzip
+import json
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+
+def encode_json(obj):
+    """Serialize to compact UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def choose_encoding(accept_encoding, size):
+    """Pick gzip/deflate from an Accept-Encoding header, or None"""
+    if size < COMPRESS_MIN_BYTES or not accept_encoding:
+        return None
+    offered = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    for encoding in ('gzip', 'deflate'):
+        if encoding in offered:
+            return encoding
+    return None
+
+
+class CachedPayload:
+    """Encoded JSON body that is rebuilt only when its state key changes"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key = None
+        self.body = None
+        self.compressed = {}
+        self.builds = 0
+        self.hits = 0
+
+    def get(self, key, build):
+        """Return encoded bytes for key, calling build() only on a key change"""
+        with self.lock:
+            if self.body is None or key != self.key:
+                self.body = encode_json(build())
+                self.key = key
+                self.compressed = {}
+                self.builds += 1
+            else:
+                self.hits += 1
+            return self.body
+
+    def get_encoded(self, key, build, accept_encoding=None):
+        """Like get() but negotiates compression; returns (bytes, encoding or None)"""
+        body = self.get(key, build)
+        encoding = choose_encoding(accept_encoding, len(body))
+        if encoding is None:
+            return body, None
+        with self.lock:
+            if self.body is not body:
+                # Rebuilt by another request in between - compress what we have
+                return _compress(body, encoding), encoding
+            if encoding not in self.compressed:
+                self.compressed[encoding] = _compress(body, encoding)
+            return self.compressed[encoding], encoding
+
+    def invalidate(self):
+        with self.lock:
+            self.key = None
+            self.body = None
+            self.compressed = {}
+
+
+class PayloadCache:
+    """CachedPayloads for parameterized views, least recently used evicted past max_entries"""
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.payloads = OrderedDict()
+
+    def payload(self, view):
+        """CachedPayload for a hashable view key (e.g. query parameters)"""
+        with self.lock:
+            payload = self.payloads.get(view)
+            if payload is None:
+                payload = self.payloads[view] = CachedPayload()
+                if len(self.payloads) > self.max_entries:
+                    self.payloads.popitem(last=False)
+            else:
+                self.payloads.move_to_end(view)
+            return payload
+
+    def invalidate(self):
+        with self.lock:
+            self.payloads.clear()
+
+
+def _compress(body, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    if encoding == 'deflate':
+        return zlib.compress(body, 6)
+    return body
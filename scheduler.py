@@ -1,9 +1,16 @@
 """Scheduler Module with Priority Support"""
+import bisect
 import copy
 from datetime import datetime
+from queue_index import QueueIndex
+from patient_registry import PatientRegistry
+from process_sync import InstrumentedLock
+
+# Waiting-queue changes kept per doctor for delta views; older clients get a full view
+MAX_QUEUE_CHANGES = 4096
 
 class Doctor:
-    def __init__(self, doctor_id, name, specialization="General"):
+    def __init__(self, doctor_id, name, specialization="General", registry=None):
         self.doctor_id = doctor_id
         self.name = name
         self.specialization = specialization
@@ -12,15 +19,74 @@ class Doctor:
         self.patient_start_time = None
         self.completed_patients = []
         self.total_patients_treated = 0
+        self.version = 0
+        self.queue_changes = []   # (version, 'insert' | 'move' | 'remove', patient_id)
+        self.changes_floor = 0    # deltas can be served for any version >= this
+        self.queue_index = QueueIndex()
+        self.discharge_hooks = []
+        self.registry = registry
+        # Guards the waiting queue, its index and the current patient; discharge hooks run outside it
+        self.lock = InstrumentedLock(f"doctor.{doctor_id}")
 
     def add_patient(self, patient):
-        patient.assigned_doctor = self.doctor_id
-        patient.arrival_time = datetime.now()
-        self.patients_queue.append(patient)
-        self._sort_queue()
+        with self.lock:
+            patient.assigned_doctor = self.doctor_id
+            patient.arrival_time = datetime.now()
+            self.patients_queue.append(patient)
+            self._sort_queue()
+            self.queue_index.add(patient)
+            if self.registry is not None:
+                self.registry.add(patient)
+            self._record_change('insert', patient.patient_id)
+
+    def _discharge(self, patient):
+        """Run discharge hooks (e.g. resource release) for a patient leaving this doctor"""
+        for hook in self.discharge_hooks:
+            try:
+                hook(patient, self.doctor_id)
+            except Exception as e:
+                print(f"Discharge hook error for {patient.patient_id}: {e}")
+
+    def _record_change(self, kind, patient_id):
+        """Bump the version and log a waiting-queue change under it"""
+        self.version += 1
+        self.queue_changes.append((self.version, kind, patient_id))
+        if len(self.queue_changes) > MAX_QUEUE_CHANGES:
+            drop = len(self.queue_changes) // 2
+            self.changes_floor = self.queue_changes[drop - 1][0]
+            del self.queue_changes[:drop]
+
+    @staticmethod
+    def _queue_key(p):
+        return (p.priority if isinstance(p.priority, int) else 999, p.arrival_time.timestamp() if isinstance(p.arrival_time, datetime) else 0)
 
     def _sort_queue(self):
-        self.patients_queue.sort(key=lambda p: (p.priority if isinstance(p.priority, int) else 999, p.arrival_time.timestamp() if isinstance(p.arrival_time, datetime) else 0))
+        self.patients_queue.sort(key=self._queue_key)
+
+    def reprioritize(self, patient, priority, burst_time=None):
+        """Change a patient's priority, moving them within the waiting queue"""
+        with self.lock:
+            if patient is self.current_patient:
+                patient.priority = priority
+                if self.registry is not None:
+                    self.registry.reindex(patient)
+                self.version += 1
+                return True
+            idx = self.queue_index.position_of(patient.patient_id)
+            if idx is None:
+                return False
+            if idx >= len(self.patients_queue) or self.patients_queue[idx] is not patient:
+                idx = self.patients_queue.index(patient)
+            del self.patients_queue[idx]
+            patient.priority = priority
+            if burst_time is not None:
+                patient.burst_time = burst_time
+            bisect.insort(self.patients_queue, patient, key=self._queue_key)
+            self.queue_index.update(patient)
+            if self.registry is not None:
+                self.registry.reindex(patient)
+            self._record_change('move', patient.patient_id)
+            return True
 
     def get_priority_label(self, priority_num):
         priority_map = {0: "CRITICAL", 1: "HIGH", 2: "MEDIUM", 3: "LOW"}
@@ -35,65 +101,200 @@ class Doctor:
         return {'patient': self.current_patient, 'elapsed_seconds': elapsed, 'total_seconds': total_time, 'remaining_seconds': remaining, 'is_complete': remaining <= 0}
 
     def update_treatment(self):
-        if self.current_patient is not None:
-            info = self.get_current_patient_info()
-            if info['is_complete']:
+        discharged = None
+        with self.lock:
+            if self.current_patient is not None:
+                info = self.get_current_patient_info()
+                if info['is_complete']:
+                    self.current_patient.start_time = self.patient_start_time
+                    self.current_patient.completion_time = datetime.now()
+                    self.current_patient.status = 'COMPLETED'
+                    arrival_timestamp = self.current_patient.arrival_time.timestamp()
+                    start_timestamp = self.patient_start_time.timestamp()
+                    self.current_patient.waiting_time = max(0, start_timestamp - arrival_timestamp)
+                    completed = copy.copy(self.current_patient)
+                    self.completed_patients.append(completed)
+                    if self.registry is not None:
+                        self.registry.reindex(self.current_patient, record=completed)
+                    self.total_patients_treated += 1
+                    discharged = self.current_patient
+                    self.current_patient = None
+                    self.patient_start_time = None
+                    self.version += 1
+
+            if self.current_patient is None and len(self.patients_queue) > 0:
+                self._sort_queue()
+                self.current_patient = self.patients_queue.pop(0)
+                self.queue_index.remove(self.current_patient.patient_id)
+                self.current_patient.status = 'IN_TREATMENT'
+                self.patient_start_time = datetime.now()
                 self.current_patient.start_time = self.patient_start_time
-                self.current_patient.completion_time = datetime.now()
-                self.current_patient.status = 'COMPLETED'
-                arrival_timestamp = self.current_patient.arrival_time.timestamp()
-                start_timestamp = self.patient_start_time.timestamp()
-                self.current_patient.waiting_time = max(0, start_timestamp - arrival_timestamp)
-                self.completed_patients.append(copy.copy(self.current_patient))
-                self.total_patients_treated += 1
-                self.current_patient = None
-                self.patient_start_time = None
-
-        if self.current_patient is None and len(self.patients_queue) > 0:
-            self._sort_queue()
-            self.current_patient = self.patients_queue.pop(0)
-            self.current_patient.status = 'IN_TREATMENT'
-            self.patient_start_time = datetime.now()
+                if self.registry is not None:
+                    self.registry.reindex(self.current_patient)
+                self._record_change('remove', self.current_patient.patient_id)
+        # Hooks take other locks (resources, vitals) and must not run under ours
+        if discharged is not None:
+            self._discharge(discharged)
+
+    def get_remaining_seconds(self):
+        with self.lock:
+            if self.current_patient is None:
+                return 0
+            return self.get_current_patient_info()['remaining_seconds']
+
+    def estimate_wait(self, position):
+        """Estimated wait in seconds for the 0-based waiting-queue position"""
+        with self.lock:
+            return self.get_remaining_seconds() + self.queue_index.burst_before(position) * 60
+
+    def estimate_insert_wait(self, priority):
+        """Queue position and wait a new patient with this priority would get"""
+        with self.lock:
+            position, burst_ahead = self.queue_index.insert_position(priority)
+            wait_seconds = self.get_remaining_seconds() + burst_ahead * 60
+        return {'doctor_id': self.doctor_id, 'doctor_name': self.name, 'queue_position': position + 1, 'wait_time_seconds': int(wait_seconds), 'wait_time_minutes': round(wait_seconds / 60, 1)}
+
+    def _queue_entry(self, patient, position, wait_time_seconds):
+        return {'id': patient.patient_id, 'name': patient.name, 'priority': patient.priority, 'priority_label': self.get_priority_label(patient.priority), 'burst_time': patient.burst_time, 'queue_position': position + 1, 'wait_time_seconds': int(wait_time_seconds), 'wait_time_minutes': round(wait_time_seconds / 60, 1)}
 
-    def get_status(self):
+    def get_status(self, offset=0, limit=None):
+        """Doctor view with the waiting queue from offset (limit entries, all if None)"""
         self.update_treatment()
-        current_info = None
-        if self.current_patient is not None:
-            info = self.get_current_patient_info()
-            current_info = {'id': self.current_patient.patient_id, 'name': self.current_patient.name, 'priority': self.current_patient.priority, 'priority_label': self.get_priority_label(self.current_patient.priority), 'burst_time': self.current_patient.burst_time, 'remaining_seconds': int(info['remaining_seconds']), 'remaining_minutes': round(info['remaining_seconds'] / 60, 1)}
+        with self.lock:
+            current_info = None
+            if self.current_patient is not None:
+                info = self.get_current_patient_info()
+                current_info = {'id': self.current_patient.patient_id, 'name': self.current_patient.name, 'priority': self.current_patient.priority, 'priority_label': self.get_priority_label(self.current_patient.priority), 'burst_time': self.current_patient.burst_time, 'remaining_seconds': int(info['remaining_seconds']), 'remaining_minutes': round(info['remaining_seconds'] / 60, 1)}
 
-        waiting_queue = []
-        cumulative_wait = 0
-        if self.current_patient is not None:
-            info = self.get_current_patient_info()
-            cumulative_wait = info['remaining_seconds']
+            queue_size = len(self.patients_queue)
+            offset = max(0, min(offset, queue_size))
+            end = queue_size if limit is None else min(queue_size, offset + max(0, limit))
+            waiting_queue = []
+            cumulative_wait = self.estimate_wait(offset)
+            for idx in range(offset, end):
+                patient = self.patients_queue[idx]
+                waiting_queue.append(self._queue_entry(patient, idx, cumulative_wait))
+                cumulative_wait += patient.burst_time * 60
 
-        for idx, patient in enumerate(self.patients_queue):
-            wait_time_seconds = cumulative_wait
-            waiting_queue.append({'id': patient.patient_id, 'name': patient.name, 'priority': patient.priority, 'priority_label': self.get_priority_label(patient.priority), 'burst_time': patient.burst_time, 'queue_position': idx + 1, 'wait_time_seconds': int(wait_time_seconds), 'wait_time_minutes': round(wait_time_seconds / 60, 1)})
-            cumulative_wait += patient.burst_time * 60
+            return {'doctor_id': self.doctor_id, 'doctor_name': self.name, 'specialization': self.specialization, 'current_patient': current_info, 'waiting_queue': waiting_queue, 'queue_size': queue_size, 'queue_offset': offset, 'next_offset': end if end < queue_size else None, 'total_treated': self.total_patients_treated, 'is_available': self.current_patient is None, 'version': self.version}
 
-        return {'doctor_id': self.doctor_id, 'doctor_name': self.name, 'specialization': self.specialization, 'current_patient': current_info, 'waiting_queue': waiting_queue, 'queue_size': len(self.patients_queue), 'total_treated': self.total_patients_treated, 'is_available': self.current_patient is None}
+    def get_queue_delta(self, since):
+        """Waiting-queue changes after version `since`, or None if they are no longer logged.
+
+        Entries are reported once with their net effect: inserted (new to the
+        client), moved (priority changed) or removed (left the queue). Applying
+        removed/moved/inserted to the client's copy, placing entries by
+        queue_position in ascending order, reproduces the current queue."""
+        self.update_treatment()
+        with self.lock:
+            if since < self.changes_floor or since > self.version:
+                return None
+            first_kind = {}
+            start = bisect.bisect_right(self.queue_changes, since, key=lambda change: change[0])
+            for _, kind, patient_id in self.queue_changes[start:]:
+                first_kind.setdefault(patient_id, kind)
+
+            inserted, moved, removed = [], [], []
+            remaining = self.get_remaining_seconds()
+            for patient_id, kind in first_kind.items():
+                position = self.queue_index.position_of(patient_id)
+                if position is None:
+                    if kind != 'insert':
+                        removed.append(patient_id)
+                    continue
+                patient = self.patients_queue[position]
+                entry = self._queue_entry(patient, position, remaining + self.queue_index.burst_before(position) * 60)
+                (inserted if kind == 'insert' else moved).append(entry)
+            inserted.sort(key=lambda entry: entry['queue_position'])
+            moved.sort(key=lambda entry: entry['queue_position'])
+            return {'since': since, 'version': self.version, 'inserted': inserted, 'moved': moved, 'removed': removed}
 
 class MultiDoctorScheduler:
     def __init__(self, num_doctors=3, algorithm='priority'):
         self.num_doctors = num_doctors
         self.algorithm = algorithm
         self.doctors = []
+        self.registry = PatientRegistry()
         for i in range(num_doctors):
             doctor_id = f"DOC{i+1:02d}"
             doctor_names = ["Dr. Sarah Johnson", "Dr. Michael Chen", "Dr. Emily Rodriguez"]
             specializations = ["Emergency Medicine", "Internal Medicine", "Surgery"]
-            doc = Doctor(doctor_id, doctor_names[i], specializations[i])
+            doc = Doctor(doctor_id, doctor_names[i], specializations[i], registry=self.registry)
             self.doctors.append(doc)
+        self.doctors_by_id = {doc.doctor_id: doc for doc in self.doctors}
+        # Distinguishes queue version tokens issued by this process from a previous run
+        self.epoch = int(datetime.now().timestamp() * 1000)
+
+    def add_discharge_hook(self, hook):
+        """Call hook(patient, doctor_id) whenever a patient completes treatment or is discharged"""
+        for doctor in self.doctors:
+            doctor.discharge_hooks.append(hook)
+
+    def find_patient(self, patient_id):
+        """(patient, doctor) for any known patient, via the registry"""
+        patient = self.registry.get(patient_id)
+        if patient is None:
+            return None, None
+        return patient, self.doctors_by_id.get(getattr(patient, 'assigned_doctor', None))
 
     def update_all_doctors(self):
         for doctor in self.doctors:
             doctor.update_treatment()
 
+    def get_state_version(self):
+        """Tuple that changes whenever any doctor's queue or treatment changes"""
+        return tuple(doctor.version for doctor in self.doctors)
+
     def get_all_doctors_status(self):
         return [doctor.get_status() for doctor in self.doctors]
 
+    def get_queue_version(self, statuses=None):
+        """Opaque token a client echoes back as `since` to get queue deltas"""
+        versions = [(s['doctor_id'], s['version']) for s in statuses] if statuses is not None else [(d.doctor_id, d.version) for d in self.doctors]
+        return f"{self.epoch}:" + ",".join(f"{doctor_id}.{version}" for doctor_id, version in versions)
+
+    def parse_queue_version(self, token):
+        """doctor_id -> version from a token; empty if it came from another scheduler instance"""
+        epoch, _, versions = (token or '').partition(':')
+        if epoch != str(self.epoch):
+            return {}
+        parsed = {}
+        for item in versions.split(','):
+            doctor_id, _, version = item.partition('.')
+            if version.isdigit():
+                parsed[doctor_id] = int(version)
+        return parsed
+
+    def get_queue_views(self, doctor_ids=None, offset=0, limit=None, since=None):
+        """Doctor views with a page of each waiting queue, or deltas against a `since` token.
+
+        In delta mode a doctor's view has 'delta' instead of 'waiting_queue'; doctors
+        whose changes are no longer logged (or missing from the token) get a full queue."""
+        doctors = self.doctors if doctor_ids is None else [self.doctors_by_id[doctor_id] for doctor_id in doctor_ids]
+        since_versions = self.parse_queue_version(since) if since is not None else {}
+        statuses = []
+        for doctor in doctors:
+            delta = None
+            if doctor.doctor_id in since_versions:
+                delta = doctor.get_queue_delta(since_versions[doctor.doctor_id])
+            if delta is None:
+                statuses.append(doctor.get_status(offset, limit))
+                continue
+            status = doctor.get_status(limit=0)
+            del status['waiting_queue'], status['queue_offset'], status['next_offset']
+            status['version'] = delta['version']
+            status['delta'] = delta
+            statuses.append(status)
+        return statuses, self.get_queue_version(statuses)
+
+    def estimate_insert_wait(self, priority):
+        """Hypothetical wait for a new patient at every doctor, shortest first"""
+        self.update_all_doctors()
+        estimates = [doctor.estimate_insert_wait(priority) for doctor in self.doctors]
+        for idx, estimate in enumerate(estimates):
+            estimate['doctor_num'] = idx + 1
+        return sorted(estimates, key=lambda e: (e['wait_time_seconds'], e['doctor_num']))
+
     def get_overall_statistics(self):
         total_in_system = sum(len(doc.patients_queue) + (1 if doc.current_patient else 0) for doc in self.doctors)
         total_waiting = sum(len(doc.patients_queue) for doc in self.doctors)
@@ -103,7 +304,18 @@ class MultiDoctorScheduler:
 
     def reset_all(self):
         for doctor in self.doctors:
-            doctor.patients_queue = []
-            doctor.current_patient = None
-            doctor.completed_patients = []
-            doctor.total_patients_treated = 0
+            with doctor.lock:
+                discharged = list(doctor.patients_queue)
+                if doctor.current_patient is not None:
+                    discharged.append(doctor.current_patient)
+                doctor.patients_queue = []
+                doctor.current_patient = None
+                doctor.completed_patients = []
+                doctor.total_patients_treated = 0
+                doctor.queue_index.clear()
+                doctor.queue_changes = []
+                doctor.version += 1
+                doctor.changes_floor = doctor.version
+            for patient in discharged:
+                doctor._discharge(patient)
+        self.registry.clear()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Train the risk and treatment models used by HealthPredictor from Health_Risk_Dataset.csv.
+
+    python train_models.py                          # search all candidates, write artifacts to .
+    python train_models.py --n-jobs 4 --cv 5
+    python train_models.py --min-score 0.9          # fastest risk model with macro-F1 >= 0.9
+    python train_models.py --report-only            # compare candidates, write nothing
+
+Writes risk_model.joblib, treatment_model.joblib, label_encoder.joblib and
+model_manifest.json (artifact version, library versions, per-candidate report).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.model_selection import GridSearchCV, KFold, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from predictor import PRIORITY_BANDS
+
+try:
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline as ResamplingPipeline
+except ImportError:
+    SMOTE = None
+    ResamplingPipeline = Pipeline
+
+NUMERIC_FEATURES = ['Respiratory_Rate', 'Oxygen_Saturation', 'O2_Scale', 'Systolic_BP', 'Heart_Rate', 'Temperature', 'On_Oxygen']
+CATEGORICAL_FEATURES = ['Consciousness']
+TARGET = 'Risk_Level'
+RANDOM_STATE = 42
+
+# The dataset has no treatment duration; the regressor learns the burst time
+# of the priority band each risk level maps to (High -> CRITICAL band ... Normal -> LOW)
+RISK_ORDER = ('High', 'Medium', 'Low', 'Normal')
+TREATMENT_MINUTES = {risk: burst_time for risk, (_, burst_time, _) in zip(RISK_ORDER, PRIORITY_BANDS)}
+
+# name -> (estimator, parameter grid) for each model
+RISK_CANDIDATES = {
+    'random_forest': (RandomForestClassifier(random_state=RANDOM_STATE),
+                      {'clf__n_estimators': [100, 300], 'clf__max_depth': [6, 10, None]}),
+    'extra_trees': (ExtraTreesClassifier(random_state=RANDOM_STATE),
+                    {'clf__n_estimators': [100, 300], 'clf__max_depth': [6, 10, None]}),
+    'decision_tree': (DecisionTreeClassifier(random_state=RANDOM_STATE),
+                      {'clf__max_depth': [4, 6, 10, None], 'clf__min_samples_leaf': [1, 5]}),
+    'logistic_regression': (LogisticRegression(max_iter=2000),
+                            {'clf__C': [0.1, 1.0, 10.0]}),
+}
+TREATMENT_CANDIDATES = {
+    'random_forest': (RandomForestRegressor(random_state=RANDOM_STATE),
+                      {'regr__n_estimators': [100, 200], 'regr__max_depth': [6, None]}),
+    'extra_trees': (ExtraTreesRegressor(random_state=RANDOM_STATE),
+                    {'regr__n_estimators': [100, 200], 'regr__max_depth': [6, None]}),
+    'decision_tree': (DecisionTreeRegressor(random_state=RANDOM_STATE),
+                      {'regr__max_depth': [4, 6, 10, None]}),
+    'ridge': (Ridge(), {'regr__alpha': [0.1, 1.0, 10.0]}),
+}
+
+
+def load_dataset(path):
+    df = pd.read_csv(path)
+    missing = [c for c in NUMERIC_FEATURES + CATEGORICAL_FEATURES + [TARGET] if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    return df[NUMERIC_FEATURES + CATEGORICAL_FEATURES], df[TARGET]
+
+
+def build_preprocessor():
+    """Imputation + scaling for vitals, one-hot for consciousness (dense output for fast single rows)"""
+    return ColumnTransformer([
+        ('num', Pipeline([('imputer', SimpleImputer(strategy='median')), ('scaler', StandardScaler())]), NUMERIC_FEATURES),
+        ('cat', Pipeline([('imputer', SimpleImputer(strategy='most_frequent')),
+                          ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))]), CATEGORICAL_FEATURES)
+    ])
+
+
+def build_risk_pipeline(estimator, memory=None):
+    steps = [('pre', build_preprocessor())]
+    if SMOTE is not None:
+        steps.append(('smote', SMOTE(k_neighbors=5, random_state=RANDOM_STATE)))
+    steps.append(('clf', estimator))
+    return ResamplingPipeline(steps, memory=memory)
+
+
+def build_treatment_pipeline(estimator, memory=None):
+    return Pipeline([('pre', build_preprocessor()), ('regr', estimator)], memory=memory)
+
+
+def single_row_latency(model, X, repeats=200):
+    """Median and p95 milliseconds for predict() on one row, after a warm-up call"""
+    rows = [X.iloc[[i % len(X)]] for i in range(repeats)]
+    model.predict(rows[0])
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return round(timings[len(timings) // 2], 3), round(timings[int(len(timings) * 0.95)], 3)
+
+
+def set_inference_threads(model):
+    """Tree ensembles predict one row faster single-threaded than with a thread pool"""
+    estimator = model.steps[-1][1]
+    if hasattr(estimator, 'n_jobs'):
+        estimator.n_jobs = 1
+    model.memory = None
+    return model
+
+
+def search_candidates(candidates, build, X, y, cv, scoring, n_jobs, cache_dir):
+    """Grid-search every candidate; returns (report rows, fitted best pipelines by name)"""
+    report = []
+    fitted = {}
+    for name, (estimator, grid) in candidates.items():
+        search = GridSearchCV(build(estimator, memory=cache_dir), grid, cv=cv, scoring=scoring, n_jobs=n_jobs, refit=True)
+        start = time.perf_counter()
+        search.fit(X, y)
+        train_seconds = time.perf_counter() - start
+        model = set_inference_threads(search.best_estimator_)
+        p50, p95 = single_row_latency(model, X)
+        report.append({
+            'candidate': name,
+            'cv_score': round(float(search.best_score_), 4),
+            'cv_std': round(float(search.cv_results_['std_test_score'][search.best_index_]), 4),
+            'best_params': {k: v for k, v in search.best_params_.items()},
+            'fits': len(search.cv_results_['params']) * cv.get_n_splits(),
+            'train_seconds': round(train_seconds, 2),
+            'predict_ms_p50': p50,
+            'predict_ms_p95': p95
+        })
+        fitted[name] = model
+        print(f"  {name:<20} score={report[-1]['cv_score']:.4f}  train={train_seconds:6.2f}s  "
+              f"predict p50={p50:.3f}ms p95={p95:.3f}ms")
+    return report, fitted
+
+
+def pick_fastest(report, min_score=None, tolerance=0.01):
+    """Lowest-latency candidate meeting min_score (default: within tolerance of the best score,
+    in the units of the scoring metric)"""
+    best = max(row['cv_score'] for row in report)
+    target = min_score if min_score is not None else best - tolerance
+    eligible = [row for row in report if row['cv_score'] >= target]
+    if not eligible:
+        eligible = [max(report, key=lambda row: row['cv_score'])]
+    return min(eligible, key=lambda row: row['predict_ms_p50'])['candidate'], target
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train Hospital OS risk and treatment models")
+    parser.add_argument('--data', default='Health_Risk_Dataset.csv')
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--cv', type=int, default=5, help="cross-validation folds")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="parallel CV/search workers (-1 = all cores)")
+    parser.add_argument('--min-score', type=float, help="macro-F1 the risk model must reach")
+    parser.add_argument('--max-mae', type=float, help="mean absolute error (minutes) the treatment model must stay under")
+    parser.add_argument('--f1-tolerance', type=float, default=0.01,
+                        help="macro-F1 slack vs. the best risk model when --min-score is not given")
+    parser.add_argument('--mae-tolerance', type=float, default=0.1,
+                        help="MAE slack in minutes vs. the best treatment model when --max-mae is not given")
+    parser.add_argument('--compress', type=int, default=3, help="zlib level for the joblib artifacts (0 = uncompressed)")
+    parser.add_argument('--report-only', action='store_true', help="compare candidates without writing artifacts")
+    args = parser.parse_args(argv)
+
+    X, risk = load_dataset(args.data)
+    label_encoder = LabelEncoder()
+    y_risk = label_encoder.fit_transform(risk)
+    y_treatment = risk.map(TREATMENT_MINUTES).astype(float)
+    if y_treatment.isna().any():
+        raise ValueError(f"Unknown risk levels: {sorted(set(risk[y_treatment.isna()]))}")
+    print(f"Loaded {len(X)} rows from {args.data} (classes: {', '.join(label_encoder.classes_)})")
+    if SMOTE is None:
+        print("imbalanced-learn not installed: training the risk model without SMOTE")
+
+    started = time.perf_counter()
+    # Fitted preprocessing (and SMOTE resampling) is cached on disk, so grid points
+    # sharing a CV fold reuse it instead of refitting
+    with tempfile.TemporaryDirectory(prefix='hospital-os-train-') as cache_dir:
+        print("Risk model candidates (macro-F1):")
+        risk_report, risk_models = search_candidates(
+            RISK_CANDIDATES, build_risk_pipeline, X, y_risk,
+            StratifiedKFold(args.cv, shuffle=True, random_state=RANDOM_STATE), 'f1_macro', args.n_jobs, cache_dir)
+        print("Treatment model candidates (negative MAE, minutes):")
+        treatment_report, treatment_models = search_candidates(
+            TREATMENT_CANDIDATES, build_treatment_pipeline, X, y_treatment,
+            KFold(args.cv, shuffle=True, random_state=RANDOM_STATE), 'neg_mean_absolute_error', args.n_jobs, cache_dir)
+    total_seconds = time.perf_counter() - started
+
+    risk_choice, risk_target = pick_fastest(risk_report, args.min_score, args.f1_tolerance)
+    treatment_choice, treatment_target = pick_fastest(
+        treatment_report, -args.max_mae if args.max_mae is not None else None, args.mae_tolerance)
+    print(f"Selected risk model: {risk_choice} (target score >= {risk_target:.4f})")
+    print(f"Selected treatment model: {treatment_choice} (target score >= {treatment_target:.4f})")
+    print(f"Total training time: {total_seconds:.1f}s")
+
+    version = datetime.now().strftime('%Y%m%d%H%M%S')
+    manifest = {
+        'version': version,
+        'trained_at': datetime.now().isoformat(),
+        'dataset': {'path': os.path.basename(args.data), 'rows': len(X), 'sha256': file_sha256(args.data)},
+        'libraries': {'scikit-learn': sklearn.__version__, 'numpy': np.__version__, 'pandas': pd.__version__,
+                      'joblib': joblib.__version__, 'smote': SMOTE is not None},
+        'compress': args.compress,
+        'cv_folds': args.cv,
+        'training_seconds': round(total_seconds, 2),
+        'risk_model': {'selected': risk_choice, 'target_score': round(risk_target, 4), 'tolerance': args.f1_tolerance,
+                       'candidates': risk_report},
+        'treatment_model': {'selected': treatment_choice, 'target_score': round(treatment_target, 4),
+                            'tolerance': args.mae_tolerance,
+                            'candidates': treatment_report},
+        'artifacts': {}
+    }
+    if args.report_only:
+        print(json.dumps(manifest, indent=2))
+        return 0
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    compress = ('zlib', args.compress) if args.compress else 0
+    for filename, obj in (('risk_model.joblib', risk_models[risk_choice]),
+                          ('treatment_model.joblib', treatment_models[treatment_choice]),
+                          ('label_encoder.joblib', label_encoder)):
+        path = os.path.join(args.output_dir, filename)
+        joblib.dump(obj, path, compress=compress)
+        manifest['artifacts'][filename] = {'bytes': os.path.getsize(path), 'sha256': file_sha256(path)}
+        print(f"  wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+    with open(os.path.join(args.output_dir, 'model_manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✓ Model artifacts version {version} written to {args.output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Vitals Stream - bedside monitor ingestion with continuous re-triage"""
+import threading
+import time
+
+import numpy as np
+
+from predictor import SCORE_CUTOFFS, PRIORITY_BANDS, vital_score
+
+# Column layout of a ring buffer row
+VITAL_FIELDS = ('heartRate', 'oxygenSat', 'tempF', 'systolicBP', 'respRate')
+COLUMNS = ('ts',) + VITAL_FIELDS + ('score',)
+TS, HR, O2, TEMP, BP, RR, SCORE = range(len(COLUMNS))
+
+# Ascending cut-offs for searchsorted: LOW < 5 <= MEDIUM < 10 <= HIGH < 20 <= CRITICAL
+_ASCENDING_CUTOFFS = np.array(sorted(SCORE_CUTOFFS))
+_BURST_TIMES = {priority: burst_time for priority, burst_time, _ in PRIORITY_BANDS}
+
+
+def priority_bands(scores):
+    """Vectorized priority (0 = CRITICAL .. 3 = LOW) for an array of triage scores"""
+    return len(_ASCENDING_CUTOFFS) - np.searchsorted(_ASCENDING_CUTOFFS, scores, side='right')
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class VitalsRingBuffer:
+    """Fixed-size ring buffer of vitals samples for one patient"""
+    def __init__(self, capacity=512):
+        self.data = np.zeros((capacity, len(COLUMNS)))
+        self.capacity = capacity
+        self.head = 0    # next row to write
+        self.count = 0
+        self.total = 0   # samples ever written
+
+    def extend(self, rows):
+        self.total += len(rows)
+        n = len(rows)
+        if n >= self.capacity:
+            rows = rows[-self.capacity:]
+            n = self.capacity
+        end = self.head + n
+        if end <= self.capacity:
+            self.data[self.head:end] = rows
+        else:
+            split = self.capacity - self.head
+            self.data[self.head:] = rows[:split]
+            self.data[:n - split] = rows[split:]
+        self.head = end % self.capacity
+        self.count = min(self.capacity, self.count + n)
+
+    def latest(self, n=None):
+        """Last n samples (all buffered if n is None), oldest first"""
+        n = self.count if n is None else min(n, self.count)
+        idx = (self.head - n + np.arange(n)) % self.capacity
+        return self.data[idx]
+
+
+class PatientStream:
+    def __init__(self, patient, doctor, capacity):
+        self.patient = patient
+        self.doctor = doctor
+        self.buffer = VitalsRingBuffer(capacity)
+        self.retriage_count = 0
+        self.last_retriage = None
+
+
+class VitalsStream:
+    """Routes monitor samples into per-patient ring buffers and re-triages on band changes.
+
+    Every sample is scored with the predictor's vital_score (vectorized over
+    the batch). Priority is only recomputed when a batch contains a sample
+    whose band differs from the patient's current one: escalation is
+    immediate, de-escalation needs `deescalate_after` consecutive samples
+    in less urgent bands. Samples with non-finite values or vitals outside
+    valid_ranges (field -> (low, high)) are rejected before scoring.
+    """
+    def __init__(self, scheduler, resource_manager, capacity=512, deescalate_after=10, valid_ranges=None):
+        self.scheduler = scheduler
+        self.resource_manager = resource_manager
+        self.valid_ranges = valid_ranges or {}
+        self.capacity = capacity
+        self.deescalate_after = deescalate_after
+        self.lock = threading.Lock()
+        self.streams = {}
+        self.samples_ingested = 0
+        self.retriage_events = []
+
+    def _locate(self, patient_id):
+        """(patient, doctor) for a patient waiting or in treatment"""
+        patient, doctor = self.scheduler.find_patient(patient_id)
+        if patient is None or patient.status not in ('WAITING', 'IN_TREATMENT'):
+            return None, None
+        return patient, doctor
+
+    def _stream_for(self, patient_id):
+        stream = self.streams.get(patient_id)
+        if stream is not None and stream.patient.status != 'COMPLETED':
+            return stream
+        patient, doctor = self._locate(patient_id)
+        if patient is None:
+            self.streams.pop(patient_id, None)
+            return None
+        stream = PatientStream(patient, doctor, self.capacity)
+        self.streams[patient_id] = stream
+        return stream
+
+    def ingest(self, patient_id, rows):
+        """Append an (n, 6) array of [ts, hr, o2, temp, bp, rr] rows; returns a result dict"""
+        if 'monitor' not in self.resource_manager.get_patient_resources(patient_id):
+            return {'patient_id': patient_id, 'accepted': 0, 'error': 'Patient has no monitor allocated'}
+
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(COLUMNS) - 1)
+        valid = np.isfinite(rows).all(axis=1)
+        for field, col in zip(VITAL_FIELDS, range(HR, SCORE)):
+            if field in self.valid_ranges:
+                low, high = self.valid_ranges[field]
+                valid &= (rows[:, col] >= low) & (rows[:, col] <= high)
+        rejected = int(len(rows) - valid.sum())
+        if rejected == len(rows):
+            return {'patient_id': patient_id, 'accepted': 0, 'rejected': rejected,
+                    'error': 'No valid samples (non-numeric or out-of-range vitals)'}
+        rows = rows[valid]
+        scores = vital_score(rows[:, O2], rows[:, HR], rows[:, TEMP], rows[:, BP], rows[:, RR])
+        block = np.column_stack((rows, scores))
+
+        with self.lock:
+            stream = self._stream_for(patient_id)
+            if stream is None:
+                return {'patient_id': patient_id, 'accepted': 0, 'error': 'Patient is not waiting or in treatment'}
+            stream.buffer.extend(block)
+            self.samples_ingested += len(block)
+
+            current = stream.patient.priority if isinstance(stream.patient.priority, int) else 3
+            bands = priority_bands(scores)
+            new_priority = None
+            if bands.min() < current:
+                new_priority = int(bands.min())
+            elif bands.max() > current:
+                recent = priority_bands(stream.buffer.latest(self.deescalate_after)[:, SCORE])
+                if len(recent) >= self.deescalate_after and recent.min() > current:
+                    new_priority = int(recent.min())
+
+            result = {'patient_id': patient_id, 'accepted': len(block), 'priority': current}
+            if rejected:
+                result['rejected'] = rejected
+            if new_priority is not None:
+                stream.doctor.reprioritize(stream.patient, new_priority, _BURST_TIMES[new_priority])
+                stream.retriage_count += 1
+                stream.last_retriage = time.time()
+                event = {'patient_id': patient_id, 'doctor_id': stream.doctor.doctor_id, 'from': current,
+                         'to': new_priority, 'timestamp': stream.last_retriage}
+                self.retriage_events.append(event)
+                del self.retriage_events[:-1000]
+                result['priority'] = new_priority
+                result['retriaged_from'] = current
+            return result
+
+    def ingest_samples(self, samples, now=None):
+        """Ingest a list of sample dicts (patient_id + vitals, optional ts), grouped per patient"""
+        now = now if now is not None else time.time()
+        grouped = {}
+        for sample in samples:
+            # Unparseable or missing values become NaN and are rejected by ingest()
+            grouped.setdefault(sample['patient_id'], []).append(
+                [_to_float(sample.get('ts', now))] + [_to_float(sample.get(field)) for field in VITAL_FIELDS])
+        return [self.ingest(patient_id, rows) for patient_id, rows in grouped.items()]
+
+    def forget(self, patient_id):
+        with self.lock:
+            self.streams.pop(patient_id, None)
+
+    def reset(self):
+        with self.lock:
+            self.streams = {}
+            self.retriage_events = []
+
+    def get_patient_vitals(self, patient_id, n=60):
+        """Recent samples and summary stats for one patient"""
+        with self.lock:
+            stream = self.streams.get(patient_id)
+            if stream is None:
+                return None
+            window = stream.buffer.latest(n)
+            total = stream.buffer.total
+            retriage_count = stream.retriage_count
+        summary = {}
+        if len(window):
+            for field, col in zip(VITAL_FIELDS, range(HR, SCORE)):
+                values = window[:, col]
+                summary[field] = {'last': float(values[-1]), 'mean': round(float(values.mean()), 1),
+                                  'min': float(values.min()), 'max': float(values.max())}
+        return {
+            'patient_id': patient_id,
+            'samples_total': total,
+            'retriage_count': retriage_count,
+            'summary': summary,
+            'samples': [dict(zip(COLUMNS, map(float, row))) for row in window]
+        }